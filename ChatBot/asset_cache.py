@@ -0,0 +1,57 @@
+# asset_cache.py - In-memory pages and static files for the ChatBot
+#
+# index.html is rendered once and static files are read once; both are
+# served from memory with an ETag derived from their content, so browsers
+# revalidate with a cheap 304 instead of downloading them again.  Content
+# hashes (unlike Flask's default mtime-based ETags) are identical on every
+# worker and host.  An entry is reloaded when its file's mtime changes.
+import hashlib
+import mimetypes
+import os
+
+from flask import Response, abort, request
+from werkzeug.security import safe_join
+
+
+class AssetCache:
+    def __init__(self, max_age: int = 0):
+        """``max_age`` > 0 lets browsers skip revalidation for that many seconds."""
+        self.max_age = max_age
+        self._entries = {}  # path -> (mtime_ns, body, etag)
+
+    def _load(self, path: str, read):
+        mtime = os.stat(path).st_mtime_ns
+        entry = self._entries.get(path)
+        if entry is None or entry[0] != mtime:
+            body = read()
+            if isinstance(body, str):
+                body = body.encode("utf-8")
+            entry = (mtime, body, hashlib.sha1(body).hexdigest()[:20])
+            self._entries[path] = entry
+        return entry
+
+    def _respond(self, entry, mimetype: str):
+        _mtime, body, etag = entry
+        resp = Response(body, mimetype=mimetype)
+        resp.set_etag(etag)
+        if self.max_age:
+            resp.cache_control.public = True
+            resp.cache_control.max_age = self.max_age
+        else:
+            resp.cache_control.no_cache = True
+        return resp.make_conditional(request)
+
+    def page(self, template_path: str, render):
+        """Serve ``render()`` (e.g. render_template), re-rendered when the template changes."""
+        return self._respond(self._load(template_path, render), "text/html")
+
+    def static(self, folder: str, filename: str):
+        path = safe_join(folder, filename)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+
+        def read():
+            with open(path, "rb") as f:
+                return f.read()
+        mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        return self._respond(self._load(path, read), mimetype)
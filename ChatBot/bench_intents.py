@@ -0,0 +1,81 @@
+# bench_intents.py - Microbenchmark for intent matching
+#
+# Compares the old chain of re.search calls (one per intent, in priority
+# order) with IntentMatcher as the intent table grows:
+#
+#   python bench_intents.py --intents 6 50 200 500 1000
+#
+# Extra intents get random made-up keywords (every 25th gets a regex
+# pattern instead), so real messages mostly fall through to the end of
+# the chain - the worst case for the sequential version.
+import argparse
+import random
+import re
+import string
+import time
+
+from intents import INTENTS, Intent, IntentMatcher
+
+MESSAGES = [
+    "i feel so happy today", "honestly a bit stressed about exams", "hello there",
+    "what time is it now", "ok bye, see you tomorrow", "i am lonely tonight",
+    "tell me something nice", "the weather is nice but i am tired", "nothing much",
+    "good morning", "can you help me with my homework please", "yo",
+]
+
+
+def make_intents(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    intents = list(INTENTS[:n])
+    while len(intents) < n:
+        i = len(intents)
+        word = lambda: "".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 9)))
+        if i % 25 == 0:
+            intents.append(Intent(f"intent{i}", pattern=f"{word()}.*{word()}"))
+        else:
+            intents.append(Intent(f"intent{i}", tuple(word() for _ in range(4))))
+    return intents
+
+
+def sequential_matcher(intents):
+    compiled = [
+        (intent.name, re.compile(r'\b(' + '|'.join(map(re.escape, intent.keywords)) + r')\b')
+         if intent.keywords else re.compile(intent.pattern))
+        for intent in intents
+    ]
+
+    def match(text):
+        for name, pattern in compiled:
+            if pattern.search(text):
+                return name
+        return None
+    return match
+
+
+def messages_per_sec(match, messages, min_time: float = 0.5):
+    count, start = 0, time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < min_time:
+        for message in messages:
+            match(message)
+        count += len(messages)
+    return count / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark intent matching as the intent table grows.")
+    parser.add_argument("--intents", type=int, nargs="+", default=[6, 50, 200, 500, 1000])
+    parser.add_argument("--seconds", type=float, default=0.5, help="minimum run time per measurement")
+    args = parser.parse_args(argv)
+
+    print(f"{'intents':>8} {'re.search chain':>18} {'IntentMatcher':>16} {'speed-up':>9}")
+    for n in args.intents:
+        intents = make_intents(n)
+        old, new = sequential_matcher(intents), IntentMatcher(intents).match
+        assert all(old(m) == new(m) for m in MESSAGES), "matchers disagree"
+        old_rate = messages_per_sec(old, MESSAGES, args.seconds)
+        new_rate = messages_per_sec(new, MESSAGES, args.seconds)
+        print(f"{n:>8} {old_rate:>14,.0f} m/s {new_rate:>12,.0f} m/s {new_rate / old_rate:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
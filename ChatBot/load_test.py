@@ -0,0 +1,124 @@
+# load_test.py - Concurrent-conversation load test for the ChatBot
+#
+# Every simulated client opens its own conversation, tells the bot a
+# unique name and then chats; a reply greeting anyone else means state
+# leaked between conversations.
+#
+#   python load_test.py --clients 200 --messages 20                 # in-process threaded server
+#   python load_test.py --url http://127.0.0.1:8000 --clients 500   # a running deployment (serve.py)
+#   python load_test.py --assets                                    # also load the page + static files
+#
+# Reports requests/sec and p50/p95/p99 latency per endpoint kind.
+import argparse
+import json
+import re
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+MESSAGES = ["i feel happy", "so stressed today", "i am sad", "what time is it", "hello", "bye"]
+ASSETS = ["/", "/static/script.js", "/static/styles.css"]
+
+
+def post(url: str, payload: dict, timeout: float = 30):
+    req = urllib.request.Request(url + "/get", data=json.dumps(payload).encode("utf-8"),
+                                 headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return json.loads(resp.read())
+
+
+def get(url: str, etag: str | None = None, timeout: float = 30):
+    """Returns (status, etag); a 304 for ``etag`` is not an error."""
+    req = urllib.request.Request(url, headers={"If-None-Match": etag} if etag else {})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+            return resp.status, resp.headers.get("ETag")
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return 304, etag
+        raise
+
+
+def timed(latencies, kind, fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    latencies.setdefault(kind, []).append(time.perf_counter() - start)
+    return result
+
+
+def run_client(url: str, client_id: int, n_messages: int, assets: bool = False):
+    name = f"user{client_id}"
+    latencies, mixups, not_modified = {}, 0, 0
+    if assets:
+        # First visit downloads, a reload revalidates with If-None-Match.
+        etags = {path: timed(latencies, "page", get, url + path)[1] for path in ASSETS}
+        for path in ASSETS:
+            status, _ = timed(latencies, "page", get, url + path, etags[path])
+            not_modified += status == 304
+    reply = timed(latencies, "chat", post, url, {"message": name})
+    cid = reply["conversation_id"]
+    for i in range(n_messages):
+        message = MESSAGES[i % len(MESSAGES)]
+        reply = timed(latencies, "chat", post, url, {"message": message, "conversation_id": cid})
+        greeted = re.search(r"User\d+", reply["response"])
+        if greeted and greeted.group() != name.title():
+            mixups += 1
+    return latencies, mixups, not_modified
+
+
+def start_local_server():
+    import logging
+    from werkzeug.serving import make_server
+    from app import app
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)  # no per-request access log
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the ChatBot with many concurrent conversations.")
+    parser.add_argument("--url", help="base URL of a running bot (default: start one in-process)")
+    parser.add_argument("--clients", type=int, default=100, help="simultaneous conversations")
+    parser.add_argument("--messages", type=int, default=10, help="messages per conversation after the name")
+    parser.add_argument("--assets", action="store_true", help="each client also loads / and the static files twice")
+    args = parser.parse_args(argv)
+
+    server, url = (None, args.url.rstrip("/")) if args.url else start_local_server()
+    latencies, mixups, not_modified, errors = {}, 0, 0, 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as pool:
+        futures = [pool.submit(run_client, url, i, args.messages, args.assets) for i in range(args.clients)]
+        for fut in futures:
+            try:
+                lat, mix, nm = fut.result()
+                for kind, values in lat.items():
+                    latencies.setdefault(kind, []).extend(values)
+                mixups += mix
+                not_modified += nm
+            except Exception as e:
+                errors += 1
+                print(f"⚠️ client failed: {e}")
+    secs = time.perf_counter() - start
+    if server is not None:
+        server.shutdown()
+
+    total = sum(len(v) for v in latencies.values())
+    print(f"{args.clients} clients, {total} requests in {secs:.1f}s -> {total / secs:.0f} req/s")
+    for kind, values in sorted(latencies.items()):
+        ms = sorted(x * 1000 for x in values)
+        pct = lambda p: ms[min(len(ms) - 1, int(p / 100 * len(ms)))]
+        print(f"{kind:>5} latency ms: p50 {pct(50):.1f} | p95 {pct(95):.1f} | p99 {pct(99):.1f} | "
+              f"mean {statistics.fmean(ms):.1f} ({len(ms)} requests)")
+    if args.assets:
+        print(f"revalidations answered 304: {not_modified}/{args.clients * len(ASSETS)}")
+    print(f"failed clients: {errors} | replies addressed to the wrong user: {mixups}")
+    return 1 if errors or mixups else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
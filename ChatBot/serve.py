@@ -0,0 +1,119 @@
+# serve.py - Production launcher for the ChatBot
+#
+# `python app.py` runs Flask's single-process debug server.  This runs the
+# same app (same / and /get routes) on a real server:
+#
+#   python serve.py                           # waitress if installed, else threaded werkzeug
+#   python serve.py --workers 4 --threads 16  # gunicorn workers (Linux/macOS)
+#
+# With more than one worker process set CHATBOT_STORE_URL=redis://... so
+# every worker sees the same conversations (see session_store.py).
+#
+# WebSockets (/ws, needs flask-sock): an open socket keeps its request
+# thread for as long as the tab is open.
+#   - gunicorn gevent workers (pip install gevent) run sockets as greenlets,
+#     so they are not capped; --worker-class auto picks them when available.
+#   - gunicorn gthread workers allow at most --ws-max sockets per process
+#     (default half of --threads), so /get and static files always keep
+#     threads; further tabs get 503 and use POST /get.
+#   - waitress cannot hand a connection over to WebSocket, so /ws is off
+#     and every tab uses POST /get.
+import argparse
+import os
+import sys
+
+from app import Sock, app
+
+
+def run_gunicorn(host: str, port: int, workers: int, threads: int, worker_class: str):
+    from gunicorn.app.base import BaseApplication
+
+    class ChatBotApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{host}:{port}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("threads", threads)
+            self.cfg.set("worker_class", worker_class)
+
+        def load(self):
+            return app
+
+    ChatBotApplication().run()
+
+
+def run_waitress(host: str, port: int, threads: int):
+    from waitress import serve
+    serve(app, host=host, port=port, threads=threads)
+
+
+def run_werkzeug(host: str, port: int):
+    from werkzeug.serving import run_simple
+    run_simple(host, port, app, threaded=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the ChatBot with a production WSGI server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=1, help="processes (gunicorn only)")
+    parser.add_argument("--threads", type=int, default=16, help="request threads per process")
+    parser.add_argument("--server", default="auto", choices=["auto", "gunicorn", "waitress", "werkzeug"])
+    parser.add_argument("--worker-class", default="auto", choices=["auto", "gthread", "gevent"],
+                        help="gunicorn worker class (auto: gevent if installed and /ws is enabled)")
+    parser.add_argument("--ws-max", type=int, default=None,
+                        help="open WebSockets per process (default: half of --threads on gthread)")
+    args = parser.parse_args(argv)
+
+    server = args.server
+    if server == "auto":
+        if args.workers > 1 and sys.platform != "win32":
+            server = "gunicorn"
+        else:
+            try:
+                import waitress  # noqa: F401
+                server = "waitress"
+            except ImportError:
+                server = "werkzeug"
+                print("ℹ️ pip install waitress (or gunicorn) for a production server; using threaded werkzeug.")
+    if args.workers > 1 and not os.getenv("CHATBOT_STORE_URL"):
+        print("⚠️ Several workers without CHATBOT_STORE_URL: each worker keeps its own conversations.")
+
+    worker_class = args.worker_class
+    if server == "gunicorn" and worker_class == "auto":
+        worker_class = "gthread"
+        if Sock is not None:
+            try:
+                import gevent  # noqa: F401
+                worker_class = "gevent"
+            except ImportError:
+                pass
+
+    ws_max = args.ws_max
+    if Sock is None:
+        ws = "off (pip install flask-sock)"
+    elif server == "waitress":
+        ws_max = 0
+        print("⚠️ waitress does not support WebSockets: /ws is off and browsers use POST /get. "
+              "Use --server gunicorn for /ws.")
+    elif server == "gunicorn" and worker_class == "gthread":
+        if ws_max is None:
+            ws_max = args.threads // 2
+        print(f"ℹ️ Each open WebSocket holds a thread: at most {ws_max} per worker, "
+              f"the rest use POST /get. pip install gevent to lift the limit.")
+    if Sock is not None:
+        app.config["WS_MAX_CONNECTIONS"] = ws_max
+        ws = "off" if ws_max == 0 else f"max {ws_max} per worker" if ws_max is not None else "on"
+
+    label = f"{server}/{worker_class}" if server == "gunicorn" else server
+    print(f"🚀 ChatBot on http://{args.host}:{args.port} ({label}, {args.workers} worker(s), "
+          f"{args.threads} threads, /ws {ws})")
+    if server == "gunicorn":
+        run_gunicorn(args.host, args.port, args.workers, args.threads, worker_class)
+    elif server == "waitress":
+        run_waitress(args.host, args.port, args.threads)
+    else:
+        run_werkzeug(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
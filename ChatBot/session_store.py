@@ -0,0 +1,74 @@
+# session_store.py - Per-conversation state for the ChatBot
+#
+# Each conversation id maps to a small JSON-able dict (e.g. {"name": "Ana"}).
+# MemoryStore keeps them in a bounded LRU with TTL eviction inside one
+# process; RedisStore shares them between gunicorn workers / hosts:
+#
+#   CHATBOT_STORE_URL=redis://localhost:6379/0 gunicorn -w 4 app:app
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryStore:
+    def __init__(self, maxsize: int = 10_000, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # conversation id -> (expires_at, state)
+        self._lock = threading.Lock()
+
+    def get(self, cid: str):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(cid)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._data[cid]
+                return None
+            self._data.move_to_end(cid)
+            return dict(entry[1])
+
+    def set(self, cid: str, state: dict):
+        with self._lock:
+            self._data[cid] = (time.monotonic() + self.ttl, dict(state))
+            self._data.move_to_end(cid)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, cid: str):
+        with self._lock:
+            self._data.pop(cid, None)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisStore:
+    def __init__(self, url: str, ttl: float = 3600, prefix: str = "chatbot:conv:"):
+        import redis  # optional: pip install redis
+        self.client = redis.Redis.from_url(url)
+        self.ttl = int(ttl)
+        self.prefix = prefix
+
+    def get(self, cid: str):
+        raw = self.client.get(self.prefix + cid)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, cid: str, state: dict):
+        # SET with EX refreshes the TTL on every message, like the LRU above
+        self.client.set(self.prefix + cid, json.dumps(state), ex=self.ttl)
+
+    def delete(self, cid: str):
+        self.client.delete(self.prefix + cid)
+
+    def __len__(self):
+        return sum(1 for _ in self.client.scan_iter(self.prefix + "*"))
+
+
+def make_store(url: str | None = None, maxsize: int = 10_000, ttl: float = 3600):
+    """RedisStore for a redis:// URL, otherwise an in-process MemoryStore."""
+    if url and url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStore(url, ttl)
+    return MemoryStore(maxsize, ttl)
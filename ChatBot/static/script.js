@@ -1,21 +1,91 @@
-function sendMessage() {
-    let userInput = document.getElementById("user-input").value;
-    if (userInput.trim() === "") return;
+// One WebSocket per tab carries the whole conversation; if the server has no
+// /ws endpoint (flask-sock not installed) every message falls back to POST /get.
+let socket = null;
+let socketReady = false;
+let useFetch = !("WebSocket" in window);
+let conversationId = sessionStorage.getItem("conversation_id");
+let outbox = [];
+let retryDelay = 500;
 
+function appendMessage(text, sender) {
     let chatBox = document.getElementById("chat-box");
-    chatBox.innerHTML += `<div class="message user">${userInput}</div>`;
-    document.getElementById("user-input").value = "";
+    let div = document.createElement("div");
+    div.className = `message ${sender}`;
+    div.textContent = text;
+    chatBox.appendChild(div);
+    chatBox.scrollTop = chatBox.scrollHeight;
+}
+
+function rememberConversation(id) {
+    if (id) {
+        conversationId = id;
+        sessionStorage.setItem("conversation_id", id);
+    }
+}
+
+function connect() {
+    let scheme = location.protocol === "https:" ? "wss" : "ws";
+    let query = conversationId ? `?conversation_id=${encodeURIComponent(conversationId)}` : "";
+    let opened = false;
+    socket = new WebSocket(`${scheme}://${location.host}/ws${query}`);
+
+    socket.onopen = () => {
+        opened = true;
+        socketReady = true;
+        retryDelay = 500;
+        outbox.forEach(message => socket.send(JSON.stringify({ message })));
+        outbox = [];
+    };
+    socket.onmessage = event => {
+        let data = JSON.parse(event.data);
+        rememberConversation(data.conversation_id);
+        if (data.response !== undefined) appendMessage(data.response, "bot");
+    };
+    socket.onclose = () => {
+        socketReady = false;
+        if (!opened) {
+            // No WebSocket endpoint, or the server is at its socket limit:
+            // send what was queued over HTTP instead.
+            console.warn("ChatBot: WebSocket unavailable, falling back to POST /get");
+            useFetch = true;
+            outbox.forEach(sendOverHttp);
+            outbox = [];
+            return;
+        }
+        setTimeout(connect, retryDelay);
+        retryDelay = Math.min(retryDelay * 2, 10000);
+    };
+}
 
+function sendOverHttp(message) {
     fetch("/get", {
         method: "POST",
         headers: {
             'Content-Type': 'application/json'
         },
-        body: JSON.stringify({ message: userInput })
+        body: JSON.stringify({ message: message, conversation_id: conversationId })
     })
     .then(res => res.json())
     .then(data => {
-        chatBox.innerHTML += `<div class="message bot">${data.response}</div>`;
-        chatBox.scrollTop = chatBox.scrollHeight;
+        rememberConversation(data.conversation_id);
+        appendMessage(data.response, "bot");
     });
 }
+
+function sendMessage() {
+    let userInput = document.getElementById("user-input").value;
+    if (userInput.trim() === "") return;
+
+    appendMessage(userInput, "user");
+    document.getElementById("user-input").value = "";
+
+    if (useFetch) {
+        sendOverHttp(userInput);
+    } else if (socketReady) {
+        socket.send(JSON.stringify({ message: userInput }));
+    } else {
+        outbox.push(userInput);
+    }
+}
+
+if (!useFetch) connect();
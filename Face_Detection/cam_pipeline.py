@@ -0,0 +1,215 @@
+# cam_pipeline.py - Pipelined capture -> detect/recognize -> display engine
+#
+#   grabber thread --(bounded frame buffer)--> N analysis workers
+#                  --(results)--> output stage on the calling thread
+#
+# The grabber reads the camera as fast as it delivers frames, so slow
+# detection no longer stalls capture.  Frame policies:
+#   "latest"   keep only the newest frames; stale ones are dropped (live camera)
+#   "every:N"  analyse every Nth captured frame, then as "latest"
+#   "all"      never drop; the grabber waits for the workers (video files)
+# Workers each build their own analyser (cascade + recognizer are not
+# guaranteed thread-safe); OpenCV releases the GIL while it works, so
+# threads run in parallel.  The output stage (cv2.imshow must stay on the
+# main thread) shows results in capture order - a frame waits only for
+# earlier frames still being analysed, never for dropped ones - and records
+# FPS and the capture-to-display latency of the most recent frames.
+# Per-stream state that must see frames in order (face tracks) goes in an
+# optional ordered stage, run on the output thread before each result is
+# shown; the workers then only do the stateless, expensive part.
+import queue
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+
+class FrameBuffer:
+    """Bounded FIFO of (seq, captured_at, frame); drops the oldest when full
+    unless ``block`` is set."""
+
+    def __init__(self, size: int = 2, block: bool = False):
+        self.size = size
+        self.block = block
+        self.dropped = 0
+        self.closed = False
+        self.in_flight = set()  # seqs handed to a worker whose result is not yet collected
+        self._items = deque()
+        self._cond = threading.Condition()
+
+    def put(self, item):
+        with self._cond:
+            while self.block and len(self._items) >= self.size and not self.closed:
+                self._cond.wait()
+            if len(self._items) >= self.size:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify_all()
+
+    def get(self):
+        """Next item, or None once closed and drained."""
+        with self._cond:
+            while not self._items and not self.closed:
+                self._cond.wait()
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self.in_flight.add(item[0])
+            self._cond.notify_all()
+            return item
+
+    def done(self, seq):
+        with self._cond:
+            self.in_flight.discard(seq)
+
+    def oldest_in_flight(self):
+        with self._cond:
+            return min(self.in_flight, default=None)
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class PipelineStats:
+    """Counters plus a sliding window of latencies, so a camera left running
+    for days keeps constant memory; percentiles cover the last ``window``
+    frames and the max covers the whole run."""
+
+    def __init__(self, window: int = 10000):
+        self.started = time.perf_counter()
+        self.captured = 0
+        self.skipped = 0      # not analysed because of an every:N policy
+        self.dropped = 0      # overwritten in the frame buffer
+        self.processed = 0
+        self.shown = 0
+        self.latencies = deque(maxlen=window)  # capture -> output, seconds
+        self.max_latency = 0.0
+
+    def fps(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.shown / elapsed if elapsed else 0.0
+
+    def record_latency(self, seconds: float):
+        self.latencies.append(seconds)
+        self.max_latency = max(self.max_latency, seconds)
+
+    def summary(self) -> str:
+        lat = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        p50, p95 = np.percentile(lat, [50, 95])
+        return (f"📈 {self.fps():.1f} FPS | latency p50 {p50:.0f} ms, p95 {p95:.0f} ms, "
+                f"max {self.max_latency * 1000:.0f} ms | "
+                f"captured {self.captured}, analysed {self.processed}, shown {self.shown}, "
+                f"dropped {self.dropped + self.skipped}")
+
+
+def parse_policy(policy: str):
+    """'latest' | 'all' | 'every:N' -> (every, block)."""
+    if policy == "latest":
+        return 1, False
+    if policy == "all":
+        return 1, True
+    if policy.startswith("every:"):
+        return max(1, int(policy.split(":", 1)[1])), False
+    raise ValueError(f"unknown frame policy: {policy!r}")
+
+
+class Pipeline:
+    def __init__(self, source, make_analyzer, workers: int = 2, policy: str = "latest", buffer_size: int | None = None,
+                 make_ordered=None):
+        """``source`` is a camera index / video path or an object with
+        read() and release().  ``make_analyzer()`` is called once per worker
+        and returns ``analyze(frame) -> detections``.
+
+        With ``make_ordered``, workers call ``analyze(frame, seq)`` and
+        ``make_ordered()`` returns ``ordered(seq, frame, result) ->
+        detections``, which sees every analysed frame in capture order."""
+        self.source = source
+        self.make_analyzer = make_analyzer
+        self.make_ordered = make_ordered
+        self.workers = max(1, workers)
+        self.every, block = parse_policy(policy)
+        self.frames = FrameBuffer(buffer_size or self.workers, block=block)
+        self.results = queue.Queue()
+        self.stats = PipelineStats()
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+        self.frames.close()
+
+    def _grab(self, cap):
+        seq = 0
+        try:
+            while not self._stop.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                self.stats.captured += 1
+                if self.stats.captured % self.every:
+                    self.stats.skipped += 1
+                    continue
+                self.frames.put((seq, time.perf_counter(), frame))
+                seq += 1
+        finally:
+            self.frames.close()
+
+    def _work(self):
+        analyze = self.make_analyzer()
+        while (item := self.frames.get()) is not None:
+            seq, captured_at, frame = item
+            try:
+                detections = analyze(frame, seq) if self.make_ordered else analyze(frame)
+            except Exception as e:
+                detections = e
+            self.results.put((seq, captured_at, frame, detections))
+        self.results.put(None)
+
+    def run(self, on_result):
+        """Feed results to ``on_result(frame, detections)`` in capture order on
+        this thread until the source ends or it returns False."""
+        cap = cv2.VideoCapture(self.source) if isinstance(self.source, (int, str)) else self.source
+        ordered = self.make_ordered() if self.make_ordered else None
+        threads = [threading.Thread(target=self._grab, args=(cap,), name="grabber", daemon=True)]
+        threads += [threading.Thread(target=self._work, name=f"analyser-{i}", daemon=True)
+                    for i in range(self.workers)]
+        for t in threads:
+            t.start()
+
+        pending, finished = {}, 0
+        try:
+            while finished < self.workers:
+                result = self.results.get()
+                if result is None:
+                    finished += 1
+                else:
+                    self.stats.processed += 1
+                    pending[result[0]] = result
+                    self.frames.done(result[0])
+                # Buffered frames are always newer than ones already taken, so
+                # only frames still with a worker can come before a pending one.
+                oldest = self.frames.oldest_in_flight()
+                for seq in sorted(pending):
+                    if oldest is not None and seq > oldest:
+                        break  # an earlier frame is still being analysed
+                    _seq, captured_at, frame, detections = pending.pop(seq)
+                    if isinstance(detections, Exception):
+                        raise detections
+                    if ordered is not None:
+                        detections = ordered(seq, frame, detections)
+                    keep_going = on_result(frame, detections)
+                    self.stats.shown += 1
+                    self.stats.record_latency(time.perf_counter() - captured_at)
+                    if keep_going is False:
+                        return self.stats
+        finally:
+            self.stop()
+            for t in threads:
+                t.join(timeout=2)
+            self.stats.dropped = self.frames.dropped
+            cap.release()
+        return self.stats
@@ -0,0 +1,196 @@
+# face_enroll.py - Incremental LBPH training for the security camera
+#
+# A manifest (train_manifest.json) records the label id of every person and
+# the size/mtime of every image already in the model.  Training then only
+# feeds new images to recognizer.update(); LBPH stores one histogram per
+# image, so that gives the same model as retraining on everything.  A full
+# rebuild happens when there is no model yet, when an image was changed or
+# deleted (LBPH cannot forget samples), or on request; it decodes the
+# images in a process pool.  Label ids come from the manifest and new people
+# get the next free id, so ids never depend on os.listdir order.
+# train_pack() does the same for a packed dataset (face_store.py).
+#
+#   python face_enroll.py            # incremental
+#   python face_enroll.py --rebuild  # retrain from scratch
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import cv2
+import numpy as np
+
+MANIFEST_FILE = "train_manifest.json"
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp", ".pgm")
+POOL_MIN_IMAGES = 200  # below this, spawning worker processes costs more than it saves
+
+
+class TrainResult(NamedTuple):
+    mode: str        # "rebuild" | "update" | "unchanged" | "empty"
+    added: int       # images fed to train()/update()
+    total: int       # images in the model
+    people: int
+
+
+def scan_dataset(dataset_dir):
+    """{person: {file: [size, mtime_ns]}} for every image under dataset_dir/<person>/."""
+    people = {}
+    for person in sorted(os.listdir(dataset_dir)):
+        person_dir = os.path.join(dataset_dir, person)
+        if not os.path.isdir(person_dir):
+            continue
+        files = {}
+        for entry in os.scandir(person_dir):
+            if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTS):
+                st = entry.stat()
+                files[entry.name] = [st.st_size, st.st_mtime_ns]
+        people[person] = files
+    return people
+
+
+def load_manifest(path=MANIFEST_FILE, labels_file=None):
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    manifest = {"labels": {}, "images": {}}
+    # Models trained before the manifest existed: keep their ids.
+    if labels_file and os.path.exists(labels_file):
+        label_map = np.load(labels_file, allow_pickle=True).item()
+        manifest["labels"] = {name: int(label_id) for label_id, name in label_map.items()}
+    return manifest
+
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def assign_labels(labels, people):
+    """Give every new person the next free id; existing ids are never changed."""
+    next_id = max(labels.values(), default=-1) + 1
+    for person in people:
+        if person not in labels:
+            labels[person] = next_id
+            next_id += 1
+    return labels
+
+
+def read_gray(path):
+    return cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+
+
+def load_images(paths, workers=None):
+    """Decode ``paths`` as grayscale, in a process pool for large batches."""
+    if len(paths) < POOL_MIN_IMAGES or workers == 1:
+        return [read_gray(p) for p in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(read_gray, paths, chunksize=64))
+
+
+def _samples(dataset_dir, items, labels, workers=None):
+    """(faces, ids, unreadable keys) for ``items`` of (person, file)."""
+    paths = [os.path.join(dataset_dir, person, file) for person, file in items]
+    faces, ids, unreadable = [], [], []
+    for (person, file), img in zip(items, load_images(paths, workers)):
+        if img is None:
+            unreadable.append(f"{person}/{file}")
+            continue
+        faces.append(img)
+        ids.append(labels[person])
+    return faces, ids, unreadable
+
+
+def train(dataset_dir, model_file, labels_file, manifest_file=MANIFEST_FILE, rebuild=False, workers=None):
+    people = scan_dataset(dataset_dir)
+    manifest = load_manifest(manifest_file, labels_file)
+    labels = assign_labels(manifest["labels"], people)
+    trained = manifest["images"]
+    # Images that failed to decode; skipped until their size/mtime changes.
+    unreadable = dict(manifest.get("unreadable", {}))
+
+    current = {f"{person}/{file}": stat for person, files in people.items() for file, stat in files.items()}
+    changed = any(current.get(key) != stat for key, stat in trained.items())
+    if rebuild or changed or not trained or not os.path.exists(model_file):
+        mode, todo, recognizer = "rebuild", current, cv2.face.LBPHFaceRecognizer_create()
+        unreadable = {}
+    else:
+        mode, todo = "update", {key: stat for key, stat in current.items()
+                                if key not in trained and unreadable.get(key) != stat}
+        if not todo:
+            return TrainResult("unchanged", 0, len(trained), len(people))
+        recognizer = cv2.face.LBPHFaceRecognizer_create()
+        recognizer.read(model_file)
+
+    items = [tuple(key.split("/", 1)) for key in sorted(todo)]
+    faces, ids, bad = _samples(dataset_dir, items, labels, workers)
+    # Unreadable images are recorded, so they are not retried every run.
+    unreadable = {key: stat for key, stat in unreadable.items() if key in current and key not in todo}
+    unreadable.update((key, todo[key]) for key in bad)
+    if not faces:
+        if mode == "rebuild":
+            return TrainResult("empty", 0, 0, len(people))
+        # Only unreadable new images: the model itself is still up to date.
+        save_manifest({"labels": labels, "images": trained, "unreadable": unreadable}, manifest_file)
+        return TrainResult("unchanged", 0, len(trained), len(people))
+
+    if mode == "rebuild":
+        recognizer.train(faces, np.array(ids))
+        trained = {}
+    else:
+        recognizer.update(faces, np.array(ids))
+    recognizer.save(model_file)
+    np.save(labels_file, {label_id: name for name, label_id in labels.items()})
+
+    trained.update((key, stat) for key, stat in todo.items() if key not in unreadable)
+    save_manifest({"labels": labels, "images": trained, "unreadable": unreadable}, manifest_file)
+    return TrainResult(mode, len(faces), len(trained), len(people))
+
+
+def train_pack(store, model_file, labels_file, manifest_file=MANIFEST_FILE, rebuild=False):
+    """Like train(), for a face_store.FaceStore: rows are append-only, so the
+    manifest only needs how many rows of which pack are in the model."""
+    manifest = load_manifest(manifest_file, labels_file)
+    labels = assign_labels(manifest["labels"], store.people())
+    done = manifest.get("pack_rows", 0)
+    total = len(store)
+
+    if rebuild or manifest.get("pack_id") != store.id or done > total or not os.path.exists(model_file):
+        mode, start = "rebuild", 0
+    elif done == total:
+        return TrainResult("unchanged", 0, total, len(store.people()))
+    else:
+        mode, start = "update", done
+    if not total:
+        return TrainResult("empty", 0, 0, 0)
+
+    faces = store.faces()
+    rows = [i for i in range(start, total) if store.persons[i]]  # "" = unreadable index row
+    samples = [faces[i] for i in rows]
+    ids = np.array([labels[store.persons[i]] for i in rows])
+    if not samples:
+        if mode == "rebuild":
+            return TrainResult("empty", 0, 0, 0)
+        save_manifest({**manifest, "labels": labels, "pack_rows": total}, manifest_file)
+        return TrainResult("unchanged", 0, total, len(store.people()))
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    if mode == "rebuild":
+        recognizer.train(samples, ids)
+    else:
+        recognizer.read(model_file)
+        recognizer.update(samples, ids)
+    recognizer.save(model_file)
+    np.save(labels_file, {label_id: name for name, label_id in labels.items()})
+    save_manifest({"labels": labels, "images": {}, "pack_id": store.id, "pack_rows": total}, manifest_file)
+    return TrainResult(mode, len(samples), total, len(store.people()))
+
+
+if __name__ == "__main__":
+    from security_cam import train_model
+
+    parser = argparse.ArgumentParser(description="Train the security camera's face recognizer.")
+    parser.add_argument("--rebuild", action="store_true", help="retrain from scratch")
+    args = parser.parse_args()
+    train_model(rebuild=args.rebuild)
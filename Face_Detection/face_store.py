@@ -0,0 +1,202 @@
+# face_store.py - Packed, memory-mapped face dataset
+#
+# Instead of one JPEG per captured face, a pack keeps every 200x200 face in
+# one raw uint8 file (faces.u8, shape (N, 200, 200)) with a CSV index giving
+# the person (and original file, for imports) of each row.  Capture appends
+# to both; training memory-maps faces.u8, so loading tens of thousands of
+# faces costs no file opens and no JPEG decoding.  Rows are never rewritten,
+# which lets face_enroll.py train only rows added since the last run.
+#
+#   python face_store.py import [dataset]   # pack existing dataset/<name>/*.jpg folders
+#   python face_store.py bench [--images N] # JPEG folders vs pack load times
+import argparse
+import csv
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+
+import cv2
+import numpy as np
+
+FACE_SIZE = (200, 200)
+FACES_FILE = "faces.u8"
+INDEX_FILE = "index.csv"
+META_FILE = "meta.json"
+
+
+class FaceStore:
+    def __init__(self, root):
+        self.root = root
+        self.frame_bytes = FACE_SIZE[0] * FACE_SIZE[1]
+        os.makedirs(root, exist_ok=True)
+        meta_path = os.path.join(root, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                self.id = json.load(f)["id"]
+        else:
+            # Identifies this pack, so a deleted and re-created one is retrained from scratch.
+            self.id = uuid.uuid4().hex
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"id": self.id, "shape": list(FACE_SIZE), "dtype": "uint8"}, f)
+        self._faces_path = os.path.join(root, FACES_FILE)
+        self._index_path = os.path.join(root, INDEX_FILE)
+        self._faces = self._index = None
+        self.persons, self.sources = self._read_index()
+
+    def _read_index(self):
+        # Row i names face i, so rows are read line by line.  A crash while
+        # append() writes a row leaves a last line without its newline: it
+        # and everything after it are ignored, and cut off by the next
+        # append().  A complete row that does not parse keeps its place with
+        # an empty person, which people() and training skip.
+        persons, sources, ends = [], [], []
+        if os.path.exists(self._index_path):
+            with open(self._index_path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        person, source = next(csv.reader([line.decode("utf-8")]))
+                    except (ValueError, StopIteration, csv.Error):
+                        person = source = ""
+                    persons.append(person)
+                    sources.append(source)
+                    ends.append((ends[-1] if ends else 0) + len(line))
+        # A crash between the two writes of append() leaves a face without
+        # an index row; ignore (and later overwrite) it.
+        size = os.path.getsize(self._faces_path) if os.path.exists(self._faces_path) else 0
+        n = min(len(persons), size // self.frame_bytes)
+        self._index_bytes = ends[n - 1] if n else 0
+        return persons[:n], sources[:n]
+
+    def __len__(self):
+        return len(self.persons)
+
+    def people(self):
+        return sorted(set(self.persons) - {""})
+
+    def append(self, person, face, source=""):
+        """Add one grayscale face (resized to FACE_SIZE if needed); returns its row."""
+        if face.shape != FACE_SIZE:
+            face = cv2.resize(face, FACE_SIZE[::-1])
+        if self._faces is None:
+            self._faces = open(self._faces_path, "ab")
+            self._faces.truncate(len(self) * self.frame_bytes)
+            self._index = open(self._index_path, "a", newline="", encoding="utf-8")
+            self._index.truncate(self._index_bytes)
+        self._faces.write(np.ascontiguousarray(face, dtype=np.uint8).tobytes())
+        self._faces.flush()
+        csv.writer(self._index).writerow([person, source])
+        self._index.flush()
+        self.persons.append(person)
+        self.sources.append(source)
+        return len(self) - 1
+
+    def close(self):
+        for f in (self._faces, self._index):
+            if f is not None:
+                f.close()
+        if self._index is not None:
+            self._index_bytes = os.path.getsize(self._index_path)
+        self._faces = self._index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def faces(self):
+        """Read-only (N, 200, 200) memory map of every face."""
+        if not len(self):
+            return np.empty((0, *FACE_SIZE), dtype=np.uint8)
+        return np.memmap(self._faces_path, dtype=np.uint8, mode="r", shape=(len(self), *FACE_SIZE))
+
+
+def import_folders(dataset_dir, store, exts=(".jpg", ".jpeg", ".png", ".bmp", ".pgm")):
+    """Append every dataset_dir/<person>/<image> not already in the store; returns how many."""
+    seen = set(store.sources)
+    added = 0
+    for person in sorted(os.listdir(dataset_dir)):
+        person_dir = os.path.join(dataset_dir, person)
+        if not os.path.isdir(person_dir):
+            continue
+        for file in sorted(os.listdir(person_dir)):
+            source = f"{person}/{file}"
+            if source in seen or not file.lower().endswith(exts):
+                continue
+            img = cv2.imread(os.path.join(person_dir, file), cv2.IMREAD_GRAYSCALE)
+            if img is None:
+                continue
+            store.append(person, img, source)
+            added += 1
+    store.close()
+    return added
+
+
+def bench(n_images, dataset_dir="dataset"):
+    """Time loading ``n_images`` faces from JPEG folders and from a pack.
+
+    Every loader ends with the same (N, 200, 200) array in memory, so the
+    pack's time includes reading every page of the memory map.  The files
+    were just written, so both are read from a warm page cache."""
+    from face_enroll import load_images
+
+    samples = []
+    if os.path.isdir(dataset_dir):
+        for person in sorted(os.listdir(dataset_dir)):
+            person_dir = os.path.join(dataset_dir, person)
+            if os.path.isdir(person_dir):
+                samples += [cv2.imread(os.path.join(person_dir, f), cv2.IMREAD_GRAYSCALE)
+                            for f in sorted(os.listdir(person_dir))]
+    samples = [s for s in samples if s is not None]
+    if not samples:
+        rng = np.random.default_rng(0)
+        samples = [cv2.GaussianBlur(rng.integers(0, 256, FACE_SIZE, dtype=np.uint8), (9, 9), 0) for _ in range(50)]
+
+    work = tempfile.mkdtemp(prefix="face_store_bench_")
+    try:
+        folders = os.path.join(work, "dataset")
+        paths = []
+        for i in range(n_images):
+            person_dir = os.path.join(folders, f"person{i // 60}")
+            os.makedirs(person_dir, exist_ok=True)
+            paths.append(os.path.join(person_dir, f"{i % 60}.jpg"))
+            cv2.imwrite(paths[-1], cv2.resize(samples[i % len(samples)], FACE_SIZE[::-1]))
+        store = FaceStore(os.path.join(work, "pack"))
+        t = time.perf_counter()
+        import_folders(folders, store)
+        print(f"import:           {time.perf_counter() - t:7.3f} s  ({n_images} images)")
+
+        def timed(label, load):
+            t = time.perf_counter()
+            faces = np.array(load())
+            elapsed = time.perf_counter() - t
+            print(f"{label:<17} {elapsed:7.3f} s  (checksum {int(faces.sum(dtype=np.uint64))}, warm cache)")
+
+        timed("jpeg (serial):", lambda: load_images(paths, workers=1))
+        timed("jpeg (pool):", lambda: load_images(paths))
+        timed("pack (mmap):", lambda: FaceStore(store.root).faces())
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Packed face dataset tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_import = sub.add_parser("import", help="pack existing dataset/<name>/ image folders")
+    p_import.add_argument("dataset", nargs="?", default="dataset")
+    p_import.add_argument("--pack", default="dataset.pack")
+    p_bench = sub.add_parser("bench", help="compare JPEG folder and pack load times")
+    p_bench.add_argument("--images", type=int, default=10000)
+    args = parser.parse_args()
+
+    if args.command == "import":
+        with FaceStore(args.pack) as store:
+            added = import_folders(args.dataset, store)
+            print(f"✅ Imported {added} images into {args.pack} ({len(store)} faces, {len(store.people())} people)")
+    else:
+        bench(args.images)
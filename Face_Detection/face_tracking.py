@@ -0,0 +1,180 @@
+# face_tracking.py - Detect-then-track for the security camera
+#
+# The Haar cascade is the expensive part of every frame.  FaceTracker runs
+# it only every ``detect_every`` frames (on a downscaled image) and follows
+# the known faces in between with a template tracker: matchTemplate of the
+# face patch cut at the last detection, searched in a window around the
+# previous box.  Each track keeps its identity; LBPH recognition is re-run
+# only when a track is new, when its last prediction was borderline, when
+# the template match weakens, or every ``recheck_every`` frames.
+#
+# The tracker itself must see frames in order.  To run detection and
+# recognition elsewhere (pipeline workers), create it with detect=None and
+# hand each detection frame's faces to process(); it then only tracks.
+import itertools
+
+import cv2
+
+
+def iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    return inter / union if union else 0.0
+
+
+def detect_faces(cascade, gray, scale: float = 1.0):
+    """detectMultiScale(gray, 1.3, 5) on a ``scale``-resized copy; boxes in ``gray`` coordinates."""
+    if scale >= 1.0:
+        return [tuple(int(v) for v in box) for box in cascade.detectMultiScale(gray, 1.3, 5)]
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return [tuple(int(round(v / scale)) for v in box) for box in cascade.detectMultiScale(small, 1.3, 5)]
+
+
+class TemplateTracker:
+    """Follows one box by normalised cross-correlation against a fixed template."""
+
+    def __init__(self, gray, box, search: float = 0.5, scale: float = 0.5):
+        self.scale = scale
+        self.search = search
+        self.box = box
+        self.score = 1.0
+        x, y, w, h = self._scaled(box)
+        self.template = self._shrink(gray)[y:y + h, x:x + w].copy()
+
+    def _scaled(self, box):
+        return tuple(int(round(v * self.scale)) for v in box)
+
+    def _shrink(self, gray):
+        if self.scale >= 1.0:
+            return gray
+        return cv2.resize(gray, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+
+    def update(self, gray, small=None):
+        """Move the box to the best match near its last position; returns the match score."""
+        small = self._shrink(gray) if small is None else small
+        th, tw = self.template.shape
+        x, y, w, h = self._scaled(self.box)
+        mx, my = int(w * self.search) + 1, int(h * self.search) + 1
+        x0, y0 = max(0, x - mx), max(0, y - my)
+        x1, y1 = min(small.shape[1], x + w + mx), min(small.shape[0], y + h + my)
+        region = small[y0:y1, x0:x1]
+        if region.shape[0] < th or region.shape[1] < tw:
+            self.score = 0.0
+            return self.score
+        res = cv2.matchTemplate(region, self.template, cv2.TM_CCOEFF_NORMED)
+        _min_val, self.score, _min_loc, (bx, by) = cv2.minMaxLoc(res)
+        self.box = (int(round((x0 + bx) / self.scale)), int(round((y0 + by) / self.scale)), self.box[2], self.box[3])
+        return self.score
+
+
+class Track:
+    __slots__ = ("id", "tracker", "name", "confidence", "known", "since_recognition", "misses")
+
+    def __init__(self, track_id, tracker):
+        self.id = track_id
+        self.tracker = tracker
+        self.name = None
+        self.confidence = None
+        self.known = False
+        self.since_recognition = 0
+        self.misses = 0
+
+    @property
+    def box(self):
+        return self.tracker.box
+
+
+class FaceTracker:
+    def __init__(self, detect, recognize, detect_every: int = 5, recheck_every: int = 30,
+                 min_score: float = 0.5, recheck_score: float = 0.75, uncertain_margin: float = 10,
+                 conf_threshold: float = 70, max_misses: int = 1, track_scale: float = 0.5):
+        """``detect(gray) -> boxes`` and ``recognize(gray, box) -> (name, confidence, known)``.
+
+        A track is dropped when its template score falls below ``min_score``
+        or it goes unmatched by ``max_misses`` + 1 detections in a row.
+        With ``detect`` None the caller supplies detections to process(),
+        and rechecks wait for the next detection frame."""
+        self.detect = detect
+        self.recognize = recognize
+        self.detect_every = max(1, detect_every)
+        self.recheck_every = recheck_every
+        self.min_score = min_score
+        self.recheck_score = recheck_score
+        self.uncertain_margin = uncertain_margin
+        self.conf_threshold = conf_threshold
+        self.max_misses = max_misses
+        self.track_scale = track_scale
+        self.tracks = []
+        self.frame_index = 0
+        self.detections_run = 0
+        self.recognitions_run = 0
+        self._ids = itertools.count(1)
+
+    def _needs_recognition(self, track):
+        if track.name is None or track.since_recognition >= self.recheck_every:
+            return True
+        if track.tracker.score < self.recheck_score:
+            return True
+        # Borderline LBPH result: confirm it on the next detection frame.
+        return abs(track.confidence - self.conf_threshold) <= self.uncertain_margin
+
+    def _new_tracker(self, gray, box):
+        return TemplateTracker(gray, box, scale=self.track_scale)
+
+    def process(self, gray, found=None):
+        """Advance one frame; returns the live tracks (with cached identities).
+
+        ``found`` is [(box, (name, confidence, known))] for a detection frame
+        analysed elsewhere; None means no detection ran on this frame."""
+        if self.detect is None:
+            detect_now = found is not None
+        else:
+            detect_now = self.frame_index % self.detect_every == 0 or not self.tracks
+        self.frame_index += 1
+        small = None
+        if self.tracks and self.track_scale < 1.0:
+            small = cv2.resize(gray, None, fx=self.track_scale, fy=self.track_scale, interpolation=cv2.INTER_AREA)
+        for track in self.tracks:
+            track.tracker.update(gray, small)
+            track.since_recognition += 1
+        self.tracks = [t for t in self.tracks if t.tracker.score >= self.min_score]
+
+        if detect_now:
+            self.detections_run += 1
+            if found is None:
+                found = [(box, None) for box in self.detect(gray)]
+            unmatched = list(self.tracks)
+            for box, identity in found:
+                best = max(unmatched, key=lambda t: iou(t.box, box), default=None)
+                if best is not None and iou(best.box, box) >= 0.3:
+                    unmatched.remove(best)
+                    # Re-anchor on the fresh detection to undo drift.
+                    score = best.tracker.score
+                    best.tracker = self._new_tracker(gray, box)
+                    best.tracker.score = score
+                    best.misses = 0
+                    if self._needs_recognition(best):
+                        self._recognize(best, gray, identity)
+                else:
+                    track = Track(next(self._ids), self._new_tracker(gray, box))
+                    self._recognize(track, gray, identity)
+                    self.tracks.append(track)
+            for track in unmatched:
+                track.misses += 1
+            self.tracks = [t for t in self.tracks if t.misses <= self.max_misses]
+        elif self.recognize is not None:
+            for track in self.tracks:
+                if track.since_recognition >= self.recheck_every or track.tracker.score < self.recheck_score:
+                    self._recognize(track, gray)
+        return self.tracks
+
+    def _recognize(self, track, gray, identity=None):
+        if identity is None:
+            identity = self.recognize(gray, track.box)
+        track.name, track.confidence, track.known = identity
+        track.since_recognition = 0
+        self.recognitions_run += 1
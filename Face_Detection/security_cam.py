@@ -2,17 +2,30 @@ import cv2
 import numpy as np
 import os
 from datetime import datetime
+from typing import NamedTuple
+
+import face_enroll
+import face_store
+from cam_pipeline import Pipeline
+from face_tracking import FaceTracker, detect_faces
 
 # ==============================
 # SETTINGS
 # ==============================
 DATASET_DIR = "dataset"
+DATASET_PACK = "dataset.pack"  # packed faces (face_store.py); "" = one JPEG per face in DATASET_DIR
 MODEL_FILE = "face_model.yml"
 LABELS_FILE = "labels.npy"
+MANIFEST_FILE = "train_manifest.json"  # what the model has been trained on (see face_enroll.py)
 CONF_THRESHOLD = 70            # LBPH confidence (lower is better, try 50-70)
 EVENT_COOLDOWN_SEC = 10
 SAVE_DIR = "intruder_snapshots"
 LOG_FILE = "security_log.csv"
+PIPELINE_WORKERS = 2           # detection/recognition threads
+FRAME_POLICY = "latest"        # latest | every:N | all (see cam_pipeline.py)
+DETECT_EVERY = 5               # run the Haar cascade every N frames, track faces in between (1 = every frame)
+DETECT_SCALE = 0.5             # downscale before detection (1.0 = full resolution)
+RECHECK_EVERY = 30             # re-run recognition on a tracked face every N frames
 
 if not os.path.exists(DATASET_DIR):
     os.makedirs(DATASET_DIR)
@@ -20,18 +33,30 @@ if not os.path.exists(SAVE_DIR):
     os.makedirs(SAVE_DIR)
 
 # Haar Cascade
-face_cascade = cv2.CascadeClassifier(
-    cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-)
+CASCADE_FILE = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+face_cascade = cv2.CascadeClassifier(CASCADE_FILE)
+
+
+class Detection(NamedTuple):
+    x: int
+    y: int
+    w: int
+    h: int
+    name: str
+    confidence: float
+    known: bool
+    track: int = 0
 
 
 # ==============================
 # IMAGE CAPTURE
 # ==============================
 def capture_images():
-    name = input("Enter person name (folder will be created): ").strip()
+    name = input("Enter person name: ").strip()
     person_dir = os.path.join(DATASET_DIR, name)
-    os.makedirs(person_dir, exist_ok=True)
+    store = face_store.FaceStore(DATASET_PACK) if DATASET_PACK else None
+    if store is None:
+        os.makedirs(person_dir, exist_ok=True)
 
     cap = cv2.VideoCapture(0)
     cv2.namedWindow("Capture", cv2.WINDOW_NORMAL)
@@ -47,13 +72,15 @@ def capture_images():
             break
 
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, 1.3, 5)
+        faces = detect_faces(face_cascade, gray, DETECT_SCALE)
 
         for (x, y, w, h) in faces:
             roi = gray[y:y+h, x:x+w]
             roi = cv2.resize(roi, (200, 200))
-            file_path = os.path.join(person_dir, f"{count}.jpg")
-            cv2.imwrite(file_path, roi)
+            if store is not None:
+                store.append(name, roi)
+            else:
+                cv2.imwrite(os.path.join(person_dir, f"{count}.jpg"), roi)
             count += 1
             cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 200, 0), 2)
 
@@ -64,119 +91,191 @@ def capture_images():
 
     cap.release()
     cv2.destroyAllWindows()
-    print(f"✅ Saved {count} images to {person_dir}")
+    if store is not None:
+        store.close()
+    print(f"✅ Saved {count} images to {DATASET_PACK or person_dir}")
 
 
 # ==============================
 # TRAIN MODEL
 # ==============================
-def train_model():
-    faces, labels = [], []
-    label_map, current_id = {}, 0
-
-    for person_name in os.listdir(DATASET_DIR):
-        person_dir = os.path.join(DATASET_DIR, person_name)
-        if not os.path.isdir(person_dir):
-            continue
-
-        label_map[current_id] = person_name
-
-        for file in os.listdir(person_dir):
-            img_path = os.path.join(person_dir, file)
-            img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
-            if img is None:
-                continue
-            faces.append(img)
-            labels.append(current_id)
-
-        current_id += 1
+def train_model(rebuild=False):
+    # Only images not yet in the model are trained (see face_enroll.py).
+    if DATASET_PACK:
+        with face_store.FaceStore(DATASET_PACK) as store:
+            # Folders captured before the pack existed are packed on first use.
+            imported = face_store.import_folders(DATASET_DIR, store)
+            if imported:
+                print(f"📦 Packed {imported} images from {DATASET_DIR} into {DATASET_PACK}")
+            result = face_enroll.train_pack(store, MODEL_FILE, LABELS_FILE, MANIFEST_FILE, rebuild=rebuild)
+    else:
+        result = face_enroll.train(DATASET_DIR, MODEL_FILE, LABELS_FILE, MANIFEST_FILE, rebuild=rebuild)
 
-    if not faces:
+    if result.mode == "unchanged":
+        print(f"✅ Model is up to date ({result.total} images, {result.people} people).")
+        return
+    if result.mode == "empty":
         print("⚠️ No data found. Capture images first!")
         return
 
-    recognizer = cv2.face.LBPHFaceRecognizer_create()
-    recognizer.train(faces, np.array(labels))
-    recognizer.save(MODEL_FILE)
-    np.save(LABELS_FILE, label_map)
-
-    print("✅ Model trained and saved.")
+    action = "retrained on" if result.mode == "rebuild" else "updated with"
+    print(f"✅ Model {action} {result.added} images ({result.total} total, {result.people} people) and saved.")
 
 
 # ==============================
 # SECURITY CAMERA
 # ==============================
+def load_models():
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    recognizer.read(MODEL_FILE)
+    return cv2.CascadeClassifier(CASCADE_FILE), recognizer
+
+
+def _detect_and_recognize(cascade, recognizer, label_map):
+    def recognize(gray, box):
+        x, y, w, h = box
+        roi = gray[max(0, y):y+h, max(0, x):x+w]
+        if roi.size == 0:
+            return "Unknown", float("inf"), False
+        label_id, confidence = recognizer.predict(cv2.resize(roi, (200, 200)))
+        known = confidence <= CONF_THRESHOLD
+        return (label_map.get(label_id, "Unknown") if known else "Unknown"), confidence, known
+
+    def detect(gray):
+        return detect_faces(cascade, gray, DETECT_SCALE)
+
+    return detect, recognize
+
+
+def build_analyzer(cascade, recognizer, label_map, detect_every=DETECT_EVERY):
+    """``analyze(frame) -> [Detection]`` for one stream of frames.
+
+    With detect_every > 1 it keeps face tracks between frames, so it must
+    see the frames of one stream in order."""
+    detect, recognize = _detect_and_recognize(cascade, recognizer, label_map)
+    if detect_every > 1:
+        tracker = FaceTracker(detect, recognize, detect_every=detect_every,
+                              recheck_every=RECHECK_EVERY, conf_threshold=CONF_THRESHOLD)
+
+        def analyze(frame):
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            return [Detection(*t.box, t.name, t.confidence, t.known, t.id) for t in tracker.process(gray)]
+    else:
+        def analyze(frame):
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            return [Detection(*box, *recognize(gray, box)) for box in detect(gray)]
+    return analyze
+
+
+def make_analyzer(label_map, detect_every=DETECT_EVERY):
+    # Called once per pipeline worker: each gets its own cascade and recognizer.
+    def factory():
+        return build_analyzer(*load_models(), label_map, detect_every)
+    return factory
+
+
+def make_detector(label_map, detect_every=DETECT_EVERY):
+    """Worker half of pooled tracking: ``analyze(frame, seq) -> (gray, found)``,
+    with found = [(box, identity)] on every detect_every-th frame, else None."""
+    def factory():
+        detect, recognize = _detect_and_recognize(*load_models(), label_map)
+
+        def analyze(frame, seq):
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            if seq % detect_every:
+                return gray, None
+            return gray, [(box, recognize(gray, box)) for box in detect(gray)]
+        return analyze
+    return factory
+
+
+def make_tracker(detect_every=DETECT_EVERY):
+    """Ordered half of pooled tracking: follows faces between the workers'
+    detection frames without running the cascade or recognizer itself."""
+    def factory():
+        tracker = FaceTracker(None, None, detect_every=detect_every,
+                              recheck_every=RECHECK_EVERY, conf_threshold=CONF_THRESHOLD)
+
+        def track(seq, frame, result):
+            gray, found = result
+            return [Detection(*t.box, t.name, t.confidence, t.known, t.id) for t in tracker.process(gray, found)]
+        return track
+    return factory
+
+
+def draw_detections(frame, detections):
+    for d in detections:
+        if d.known:
+            color = (0, 200, 0)
+            text = f"{d.name} ({int(d.confidence)})"
+        else:
+            color = (0, 0, 255)
+            text = "Unknown"
+
+        cv2.rectangle(frame, (d.x, d.y), (d.x+d.w, d.y+d.h), color, 2)
+        cv2.putText(frame, text, (d.x, d.y-10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
+
+
 def run_security():
     if not os.path.exists(MODEL_FILE) or not os.path.exists(LABELS_FILE):
         print("⚠️ Train the model first!")
         return
 
-    recognizer = cv2.face.LBPHFaceRecognizer_create()
-    recognizer.read(MODEL_FILE)
     label_map = np.load(LABELS_FILE, allow_pickle=True).item()
 
-    cap = cv2.VideoCapture(0)
     cv2.namedWindow("Security Cam", cv2.WINDOW_NORMAL)
     cv2.resizeWindow("Security Cam", 800, 600)
 
     print("🔒 Security Camera ON (press 'q' to quit)")
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, 1.3, 5)
-
-        for (x, y, w, h) in faces:
-            roi = gray[y:y+h, x:x+w]
-            roi_resized = cv2.resize(roi, (200, 200))
-
-            label_id, confidence = recognizer.predict(roi_resized)
-
-            if confidence <= CONF_THRESHOLD:
-                name = label_map.get(label_id, "Unknown")
-                color = (0, 200, 0)
-                text = f"{name} ({int(confidence)})"
-            else:
-                name = "Unknown"
-                color = (0, 0, 255)
-                text = "Unknown"
-
-            cv2.rectangle(frame, (x, y), (x+w, y+h), color, 2)
-            cv2.putText(frame, text, (x, y-10),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
+    # Capture, analysis and display run in separate threads (cam_pipeline.py),
+    # so slow detection drops stale frames instead of stalling the camera.
+    # Tracking carries state from frame to frame, so with DETECT_EVERY > 1 the
+    # workers only detect and recognise, and tracks follow in capture order.
+    if DETECT_EVERY > 1:
+        pipeline = Pipeline(0, make_detector(label_map), workers=PIPELINE_WORKERS, policy=FRAME_POLICY,
+                            make_ordered=make_tracker())
+    else:
+        pipeline = Pipeline(0, make_analyzer(label_map), workers=PIPELINE_WORKERS, policy=FRAME_POLICY)
 
+    def show(frame, detections):
+        draw_detections(frame, detections)
+        cv2.putText(frame, f"{pipeline.stats.fps():.1f} FPS", (10, 25),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
         cv2.imshow("Security Cam", frame)
+        return not (cv2.waitKey(1) & 0xFF == ord("q"))
 
-        if cv2.waitKey(1) & 0xFF == ord("q"):
-            break
-
-    cap.release()
+    stats = pipeline.run(show)
     cv2.destroyAllWindows()
+    print(stats.summary())
     print("🔓 Security Camera OFF")
 
 
 # ==============================
 # MENU
 # ==============================
-while True:
-    print("\n--- SECURITY SYSTEM ---")
-    print("1. Capture Images")
-    print("2. Train Model")
-    print("3. Run Security Camera")
-    print("4. Exit")
-    choice = input("\nSelect option: ")
-
-    if choice == "1":
-        capture_images()
-    elif choice == "2":
-        train_model()
-    elif choice == "3":
-        run_security()
-    elif choice == "4":
-        print("👋 Exiting...")
-        break
-    else:
-        print("❌ Invalid option.")
+def main():
+    while True:
+        print("\n--- SECURITY SYSTEM ---")
+        print("1. Capture Images")
+        print("2. Train Model")
+        print("3. Run Security Camera")
+        print("4. Exit")
+        choice = input("\nSelect option: ")
+
+        if choice == "1":
+            capture_images()
+        elif choice == "2":
+            train_model()
+        elif choice == "3":
+            run_security()
+        elif choice == "4":
+            print("👋 Exiting...")
+            break
+        else:
+            print("❌ Invalid option.")
+
+
+if __name__ == "__main__":
+    main()
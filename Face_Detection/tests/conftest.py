@@ -0,0 +1,5 @@
+# The Face_Detection modules are flat files next to security_cam.py.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
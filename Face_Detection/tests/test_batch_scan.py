@@ -0,0 +1,80 @@
+# test_batch_scan.py - chunk planning and argument checks
+import cv2
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def batch_scan(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # security_cam creates its folders on import
+    import batch_scan
+    return batch_scan
+
+
+def make_frames(directory, n):
+    directory.mkdir()
+    for i in range(n):
+        cv2.imwrite(str(directory / f"frame{i}.png"), np.full((8, 8, 3), i, dtype=np.uint8))
+    return str(directory)
+
+
+def make_video(path, n):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 25, (32, 32))
+    for i in range(n):
+        writer.write(np.full((32, 32, 3), i * 8 % 256, dtype=np.uint8))
+    writer.release()
+    return str(path)
+
+
+@pytest.mark.parametrize("total, chunk, expected", [
+    (0, 10, [(0, None)]),
+    (5, 10, [(0, None)]),
+    (10, 10, [(0, None)]),
+    (20, 10, [(0, 10), (10, None)]),
+    (21, 10, [(0, 10), (10, 20), (20, None)]),
+    (3, 1, [(0, 1), (1, 2), (2, None)]),
+])
+def test_plan_chunks_boundaries(batch_scan, tmp_path, total, chunk, expected):
+    source = make_frames(tmp_path / "frames", total)
+    chunks = batch_scan.plan_chunks(source, chunk)
+    assert [(start, stop) for _source, _i, start, stop in chunks] == expected
+    assert [i for _source, i, _start, _stop in chunks] == list(range(len(expected)))
+
+
+def test_chunks_read_every_frame_once(batch_scan, tmp_path):
+    source = make_frames(tmp_path / "frames", 23)
+    frames = [index for _source, _i, start, stop in batch_scan.plan_chunks(source, 5)
+              for index, _frame, _t in batch_scan._read_frames(source, start, stop)]
+    assert frames == list(range(23))
+
+
+def test_frames_sort_naturally(batch_scan, tmp_path):
+    source = make_frames(tmp_path / "frames", 12)
+    names = [path.rsplit("frame", 1)[1] for path in batch_scan.list_frames(source)]
+    assert names[:3] == ["0.png", "1.png", "2.png"] and names[-1] == "11.png"
+
+
+def test_video_chunks_cover_the_whole_file(batch_scan, tmp_path):
+    source = make_video(tmp_path / "clip.avi", 25)
+    chunks = batch_scan.plan_chunks(source, 10)
+    if cv2.VideoCapture(source).get(cv2.CAP_PROP_FRAME_COUNT) <= 0:
+        assert chunks == [(source, 0, 0, None)]
+    else:
+        assert [(start, stop) for _source, _i, start, stop in chunks] == [(0, 10), (10, 20), (20, None)]
+    frames = [index for _source, _i, start, stop in chunks
+              for index, _frame, _t in batch_scan._read_frames(source, start, stop)]
+    assert frames == list(range(25))
+
+
+def test_unreadable_video_exits(batch_scan, tmp_path):
+    with pytest.raises(SystemExit):
+        batch_scan.plan_chunks(str(tmp_path / "missing.mp4"), 10)
+
+
+@pytest.mark.parametrize("option", ["--chunk", "--detect-every", "--workers"])
+@pytest.mark.parametrize("value", ["0", "-3", "x"])
+def test_counts_must_be_positive(batch_scan, option, value, capsys):
+    with pytest.raises(SystemExit) as exc:
+        batch_scan.main(["clip.mp4", option, value])
+    assert exc.value.code == 2
+    assert option in capsys.readouterr().err
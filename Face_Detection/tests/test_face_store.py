@@ -0,0 +1,101 @@
+# test_face_store.py - packed dataset append, reopen and crash recovery
+import os
+
+import numpy as np
+import pytest
+
+from face_store import FACE_SIZE, FaceStore, import_folders
+
+
+def face(value):
+    return np.full(FACE_SIZE, value, dtype=np.uint8)
+
+
+@pytest.fixture
+def store(tmp_path):
+    with FaceStore(str(tmp_path / "pack")) as store:
+        for i, person in enumerate(["alice", "alice", "bob"]):
+            store.append(person, face(i), f"{person}/{i}.jpg")
+    return store
+
+
+def index_path(store):
+    return os.path.join(store.root, "index.csv")
+
+
+def faces_path(store):
+    return os.path.join(store.root, "faces.u8")
+
+
+def test_append_and_reopen(store):
+    reopened = FaceStore(store.root)
+    assert reopened.id == store.id
+    assert reopened.persons == ["alice", "alice", "bob"]
+    assert reopened.sources[2] == "bob/2.jpg"
+    assert reopened.people() == ["alice", "bob"]
+    faces = reopened.faces()
+    assert faces.shape == (3, *FACE_SIZE)
+    assert [int(f[0, 0]) for f in faces] == [0, 1, 2]
+
+
+def test_append_resizes_faces(tmp_path):
+    with FaceStore(str(tmp_path / "pack")) as store:
+        assert store.append("carol", np.zeros((90, 120), dtype=np.uint8)) == 0
+    assert FaceStore(store.root).faces().shape == (1, *FACE_SIZE)
+
+
+def test_face_without_index_row_is_overwritten(store):
+    with open(faces_path(store), "ab") as f:  # crash after the face, before its row
+        f.write(face(9).tobytes())
+    reopened = FaceStore(store.root)
+    assert len(reopened) == 3
+    reopened.append("dave", face(7), "dave/0.jpg")
+    reopened.close()
+    assert [int(f[0, 0]) for f in FaceStore(store.root).faces()] == [0, 1, 2, 7]
+
+
+def test_torn_last_row_is_ignored_and_truncated(store):
+    with open(faces_path(store), "ab") as f:
+        f.write(face(9).tobytes())
+    with open(index_path(store), "ab") as f:  # crash halfway through the row
+        f.write(b"carol,car")
+    reopened = FaceStore(store.root)
+    assert reopened.persons == ["alice", "alice", "bob"]
+
+    reopened.append("dave", face(7), "dave/0.jpg")
+    reopened.close()
+    reopened.append("erin", face(8), "erin/0.jpg")  # reopens the files after close()
+    reopened.close()
+    with open(index_path(store), "rb") as f:
+        assert f.read().endswith(b"bob,bob/2.jpg\r\ndave,dave/0.jpg\r\nerin,erin/0.jpg\r\n")
+    final = FaceStore(store.root)
+    assert final.persons == ["alice", "alice", "bob", "dave", "erin"]
+    assert [int(f[0, 0]) for f in final.faces()] == [0, 1, 2, 7, 8]
+
+
+def test_malformed_row_keeps_later_faces_aligned(store):
+    with open(index_path(store), "rb") as f:
+        rows = f.read().split(b"\r\n")
+    rows[1] = b"just-a-name"
+    with open(index_path(store), "wb") as f:
+        f.write(b"\r\n".join(rows))
+    reopened = FaceStore(store.root)
+    assert reopened.persons == ["alice", "", "bob"]
+    assert reopened.people() == ["alice", "bob"]
+    assert int(reopened.faces()[2][0, 0]) == 2
+
+
+def test_import_folders_skips_known_sources(tmp_path):
+    import cv2
+
+    dataset = tmp_path / "dataset"
+    for person in ("alice", "bob"):
+        (dataset / person).mkdir(parents=True)
+        cv2.imwrite(str(dataset / person / "0.jpg"), face(128))
+    (dataset / "bob" / "notes.txt").write_text("not an image")
+
+    store = FaceStore(str(tmp_path / "pack"))
+    assert import_folders(str(dataset), store) == 2
+    cv2.imwrite(str(dataset / "alice" / "1.jpg"), face(64))
+    assert import_folders(str(dataset), FaceStore(store.root)) == 1
+    assert sorted(FaceStore(store.root).sources) == ["alice/0.jpg", "alice/1.jpg", "bob/0.jpg"]
@@ -0,0 +1,112 @@
+# batch_recommend.py - Headless batch recommendations for StudyBuddy
+#
+# Pre-computes catalog recommendations for a whole syllabus:
+#
+#   python batch_recommend.py syllabus.txt -o recs.jsonl --batch-size 1024 --workers 4
+#
+# Queries are read one per line and processed in chunks: each chunk is
+# encoded in one SentenceTransformer.encode call (spread over several
+# processes with --workers) and scored against the catalog as a batch -
+# one matrix multiply for the exact index, one per probed bucket for IVF.
+# Results are written as one JSON object per line as soon as a chunk is
+# done, so memory stays bounded by the chunk size.
+# YouTube and Gemini are not called.
+import argparse
+import itertools
+import json
+import sys
+import time
+
+import recommender
+
+
+def read_queries(path: str):
+    stream = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    with stream:
+        for line in stream:
+            query = line.strip()
+            if query:
+                yield query
+
+
+def chunked(iterable, size: int):
+    it = iter(iterable)
+    while chunk := list(itertools.islice(it, size)):
+        yield chunk
+
+
+class Encoder:
+    """SentenceTransformer.encode, optionally fanned out over worker processes."""
+
+    def __init__(self, model, workers: int = 1, batch_size: int = 64):
+        self.model = model
+        self.batch_size = batch_size
+        self.pool = None
+        if workers > 1:
+            self.pool = model.start_multi_process_pool(["cpu"] * workers)
+
+    def encode(self, texts):
+        if self.pool is not None:
+            return self.model.encode_multi_process(texts, self.pool, batch_size=self.batch_size)
+        return self.model.encode(texts, batch_size=self.batch_size)
+
+    def close(self):
+        if self.pool is not None:
+            self.model.stop_multi_process_pool(self.pool)
+
+
+def run(args):
+    catalog = recommender.load_resources_and_model(args.csv, model_name=args.model, index_kind=args.index)
+    resources, model = catalog.resources, catalog.model
+    if model is None:
+        print(f"⚠️ Embedding model unavailable ({catalog.model_error}), using fuzzy matching.", file=sys.stderr)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    encoder = Encoder(model, args.workers, args.encode_batch_size) if model is not None else None
+    total, start = 0, time.perf_counter()
+    try:
+        for chunk in chunked(read_queries(args.queries), args.batch_size):
+            if encoder is not None:
+                all_hits = catalog.ranker.rank(encoder.encode(chunk), k=args.top_k, threshold=args.threshold)
+                results = [
+                    [recommender.row_to_rec(resources, row_idx, score) for row_idx, score in hits]
+                    for hits in all_hits
+                ]
+            else:
+                results = [
+                    [recommender.row_to_rec(resources, row_idx)
+                     for row_idx in catalog.fuzzy_matcher.match(q, args.fuzzy_threshold)]
+                    for q in chunk
+                ]
+            for query, recs in zip(chunk, results):
+                out.write(json.dumps({"query": query, "resources": recs}, ensure_ascii=False) + "\n")
+            out.flush()
+            total += len(chunk)
+    finally:
+        if encoder is not None:
+            encoder.close()
+        if out is not sys.stdout:
+            out.close()
+
+    secs = time.perf_counter() - start
+    print(f"✅ {total} queries in {secs:.1f}s ({total / secs if secs else 0:.0f} queries/s)", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch StudyBuddy recommendations to JSONL.")
+    parser.add_argument("queries", help="text file with one query per line ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file (default: stdout)")
+    parser.add_argument("--csv", default=recommender.DEFAULT_CSV, help="resource catalog")
+    parser.add_argument("--model", default=recommender.DEFAULT_MODEL)
+    parser.add_argument("--index", default="auto", choices=["auto", "exact", "ivf"])
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=0.6)
+    parser.add_argument("--fuzzy-threshold", type=int, default=70)
+    parser.add_argument("--batch-size", type=int, default=1024, help="queries scored per chunk")
+    parser.add_argument("--encode-batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=1, help="processes used for encoding")
+    run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+# benchmark.py - Offline performance benchmark for StudyBuddy
+#
+# Times the pieces the app depends on against synthetic catalogs in the
+# resources.csv schema, with local stand-ins for the network services:
+#
+#   python benchmark.py --sizes 1k 100k 1M --model stub -o bench.json
+#   python benchmark.py --compare old.json -o new.json
+#
+# Stages:
+#   load      recommender.load_resources_and_model (catalog + model + index)
+#   semantic  recommender.find_resources with the embedding model
+#   fuzzy     the FuzzyMatcher fallback
+#   youtube   YouTubeClient.search (as used by the app's fetch_videos) against a
+#             local HTTP stub, through the same TTLCache as the app
+#   notes     NotesCache over FakeNotesClient instead of Gemini
+#   pdf       pdf_export.favorites_pdf, half cache misses and half hits
+#
+# Each (size, stage) runs in a fresh process whose RSS high-water mark is
+# reset when the stage starts (Linux, /proc/self/clear_refs), so peak RSS
+# is per stage.  Elsewhere it falls back to ru_maxrss, which a child
+# inherits from its parent (peak_rss_per_stage is false in the results).
+# Synthetic catalogs and their embedding caches are kept in --workdir, so
+# only the first run of a size pays for encoding every topic in "load".
+# Results are written as JSON (one record per size/stage); --compare
+# prints the p50/p95 change against an earlier results file.
+import argparse
+import hashlib
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import get_context
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+STAGES = ["load", "semantic", "fuzzy", "youtube", "notes", "pdf"]
+SIZE_ALIASES = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000}
+STUB_MODEL = "stub"
+
+_WORDS = (
+    "python pandas numpy machine learning deep neural network data science "
+    "statistics algebra calculus sql database web flask django react java "
+    "javascript html css docker kubernetes cloud linux git security "
+    "cryptography compiler operating system graph theory algorithms "
+    "structures computer vision nlp transformers regression probability"
+).split()
+_TYPES = ["Docs", "Video", "GitHub", "Course", "Article", "Book"]
+
+
+# ---------------- SYNTHETIC DATA ----------------
+def parse_size(text: str) -> int:
+    return SIZE_ALIASES.get(text) or int(text)
+
+
+def make_topic(rng: random.Random, i: int) -> str:
+    a, b = rng.sample(_WORDS, 2)
+    return f"{a.title()} {b.title()} {i}"
+
+
+def write_catalog(path: str, rows: int, seed: int = 0):
+    """Write a resources.csv-shaped catalog, ~3 resources per topic like the real one."""
+    import pandas as pd
+    rng = random.Random(seed)
+    topics = [make_topic(rng, i) for i in range(max(1, rows // 3))]
+    topic_col = [topics[i // 3 % len(topics)] for i in range(rows)]
+    pd.DataFrame({
+        "topic": topic_col,
+        "title": [f"{t} - part {i % 3 + 1}" for i, t in enumerate(topic_col)],
+        "type": [_TYPES[i % len(_TYPES)] for i in range(rows)],
+        "link": [f"https://example.com/r/{i}" for i in range(rows)],
+    }).to_csv(path, index=False)
+
+
+def catalog_path(workdir: str, rows: int, seed: int) -> str:
+    path = os.path.join(workdir, f"catalog_{rows}_{seed}.csv")
+    if not os.path.exists(path):
+        write_catalog(path, rows, seed)
+    return path
+
+
+def make_queries(csv_path: str, n: int, seed: int = 0):
+    """Catalog topics, lowercased with the trailing id dropped, Zipf-weighted so
+    popular queries repeat the way real searches do."""
+    import pandas as pd
+    topics = pd.read_csv(csv_path, usecols=["topic"])["topic"].drop_duplicates().tolist()
+    rng = np.random.default_rng(seed)
+    picks = np.minimum(rng.zipf(1.3, size=n) - 1, len(topics) - 1)
+    order = rng.permutation(len(topics))
+    return [topics[order[p]].rsplit(" ", 1)[0].lower() for p in picks]
+
+
+class HashingEncoder:
+    """Offline stand-in for SentenceTransformer: hashed bag of words."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def encode(self, texts, batch_size: int = 64, **kwargs):
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in str(text).lower().split():
+                h = int.from_bytes(hashlib.md5(word.encode("utf-8")).digest()[:4], "little")
+                out[i, h % self.dim] += 1.0
+        return out
+
+
+def load_catalog(csv_path: str, model_name: str, index_kind: str):
+    import recommender
+    if model_name != STUB_MODEL:
+        return recommender.load_resources_and_model(csv_path, model_name, index_kind)
+    catalog = recommender.load_catalog(csv_path)
+    return recommender.attach_model(catalog, HashingEncoder(), model_name, csv_path, index_kind)
+
+
+# ---------------- LOCAL YOUTUBE STUB ----------------
+class _YouTubeStub(BaseHTTPRequestHandler):
+    latency = 0.0
+
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        query = params.get("q", [""])[0]
+        n = int(params.get("maxResults", ["3"])[0])
+        time.sleep(self.latency)
+        body = json.dumps({"items": [
+            {"id": {"videoId": f"{abs(hash(query)) % 10**8}{i}"},
+             "snippet": {"title": f"{query} tutorial {i}"}}
+            for i in range(n)
+        ]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_youtube_stub(latency: float):
+    handler = type("Handler", (_YouTubeStub,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/youtube/v3/search"
+
+
+# ---------------- STAGES ----------------
+def _time_each(fn, items):
+    latencies = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def bench_load(cfg):
+    start = time.perf_counter()
+    load_catalog(cfg["csv"], cfg["model"], cfg["index"])
+    return [time.perf_counter() - start], {}
+
+
+def bench_semantic(cfg):
+    import recommender
+    catalog = load_catalog(cfg["csv"], cfg["model"], cfg["index"])
+    return _time_each(lambda q: recommender.find_resources(q, catalog), cfg["queries"]), {}
+
+
+def bench_fuzzy(cfg):
+    import recommender
+    catalog = recommender.load_catalog(cfg["csv"])
+    return _time_each(lambda q: catalog.fuzzy_matcher.match(q), cfg["queries"]), {}
+
+
+def bench_youtube(cfg):
+    from ttl_cache import TTLCache
+    from youtube_client import YouTubeClient
+    server, url = start_youtube_stub(cfg["service_latency"])
+    try:
+        cache = TTLCache(maxsize=1024, ttl=3600)
+        client = YouTubeClient("offline", cache=cache, api_url=url)
+        latencies = _time_each(lambda q: client.search(q, max_results=3), cfg["queries"])
+    finally:
+        server.shutdown()
+    return latencies, {"cache_hit_ratio": cache.stats()["hit_ratio"]}
+
+
+def bench_notes(cfg):
+    from notes_cache import FakeNotesClient, NotesCache
+    from ttl_cache import TTLCache
+    fake = FakeNotesClient(delay=cfg["service_latency"] / 5)
+    notes = NotesCache(fake, TTLCache(maxsize=256, ttl=3600))
+    latencies = _time_each(lambda q: notes.get(q, f"{q} tutorial 0"), cfg["queries"])
+    return latencies, {"generations": fake.calls}
+
+
+def bench_pdf(cfg):
+    import pdf_export
+    rng = random.Random(cfg["seed"])
+    lists = [
+        [{"title": f"{q} - part {j}", "type": rng.choice(_TYPES), "source": "csv",
+          "url": f"https://example.com/{i}/{j}"} for j in range(cfg["favorites"])]
+        for i, q in enumerate(cfg["queries"][:max(1, len(cfg["queries"]) // 2)])
+    ]
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Every list twice: the first export renders, the second is a hit.
+        return _time_each(lambda favs: pdf_export.favorites_pdf(favs, cache_dir), lists + lists), {}
+
+
+BENCHES = {
+    "load": bench_load,
+    "semantic": bench_semantic,
+    "fuzzy": bench_fuzzy,
+    "youtube": bench_youtube,
+    "notes": bench_notes,
+    "pdf": bench_pdf,
+}
+
+
+def reset_peak_rss() -> bool:
+    """Reset this process's RSS high-water mark (Linux only).
+
+    A child inherits the parent's ru_maxrss, so without this every stage
+    would report at least the parent's own peak."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 2**10, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def run_stage(stage: str, cfg: dict):
+    """Runs in a child process; returns one result record."""
+    rss_reset = reset_peak_rss()
+    start = time.perf_counter()
+    latencies, extra = BENCHES[stage](cfg)
+    wall = time.perf_counter() - start
+    ms = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "rows": cfg["rows"],
+        "stage": stage,
+        "n": len(latencies),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+        "throughput_per_s": round(len(latencies) / ms.sum() * 1000, 1) if ms.sum() else None,
+        "wall_s": round(wall, 3),
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_rss_per_stage": rss_reset,
+        **extra,
+    }
+
+
+# ---------------- REPORTING ----------------
+def print_table(results, baseline=None):
+    base = {(r["rows"], r["stage"]): r for r in (baseline or [])}
+    print(f"{'rows':>9} {'stage':<9} {'n':>5} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} "
+          f"{'ops/s':>10} {'rss MB':>8}", file=sys.stderr)
+    for r in results:
+        line = (f"{r['rows']:>9} {r['stage']:<9} {r['n']:>5} {r['p50_ms']:>10.3f} {r['p95_ms']:>10.3f} "
+                f"{r['p99_ms']:>10.3f} {r['throughput_per_s'] or 0:>10.1f} {r['peak_rss_mb'] or 0:>8.1f}")
+        old = base.get((r["rows"], r["stage"]))
+        if old and old["p50_ms"] and old["p95_ms"]:
+            line += (f"  p50 {100 * (r['p50_ms'] / old['p50_ms'] - 1):+.0f}%"
+                     f"  p95 {100 * (r['p95_ms'] / old['p95_ms'] - 1):+.0f}%")
+        print(line, file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline StudyBuddy performance benchmark.")
+    parser.add_argument("--sizes", nargs="+", default=["1k", "100k"], help="catalog rows (1k, 100k, 1M or a number)")
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES)
+    parser.add_argument("--queries", type=int, default=200, help="queries per stage")
+    parser.add_argument("--model", default=STUB_MODEL,
+                        help=f"embedding model name, or '{STUB_MODEL}' for a hashing encoder")
+    parser.add_argument("--index", default="auto", choices=["auto", "exact", "ivf"])
+    parser.add_argument("--service-latency", type=float, default=0.0,
+                        help="seconds the YouTube/Gemini stubs wait per call")
+    parser.add_argument("--favorites", type=int, default=20, help="favorites per exported PDF")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "studybuddy_bench"),
+                        help="where synthetic catalogs (and their embedding caches) are kept")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="-", help="JSON results file (default: stdout)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.workdir, exist_ok=True)
+    results = []
+    for rows in map(parse_size, args.sizes):
+        csv_path = catalog_path(args.workdir, rows, args.seed)
+        cfg = {
+            "rows": rows, "csv": csv_path, "model": args.model, "index": args.index,
+            "queries": make_queries(csv_path, args.queries, args.seed),
+            "service_latency": args.service_latency, "favorites": args.favorites, "seed": args.seed,
+        }
+        for stage in args.stages:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                results.append(pool.submit(run_stage, stage, cfg).result())
+            print(f"… {rows} rows / {stage} done", file=sys.stderr, flush=True)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    print_table(results, baseline)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True) + "\n"
+    if args.output == "-":
+        sys.stdout.write(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# catalog_watcher.py - Hot reload of resources.csv for StudyBuddy
+#
+# Holds the current recommender.Catalog snapshot and polls the CSV's
+# mtime/size on a background thread.  On a change it calls ``reload`` to
+# build the next snapshot (which diffs rows by content hash and encodes
+# only the delta) and swaps it in with a single attribute assignment.
+# Readers grab ``watcher.snapshot`` once per query and never lock.
+import os
+import threading
+
+
+def file_signature(path: str):
+    try:
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+    except OSError:
+        return None
+
+
+class CatalogWatcher:
+    def __init__(self, csv_path: str, initial, reload, interval: float | None = 2.0):
+        """``reload(snapshot) -> snapshot`` builds the next snapshot; an
+        ``interval`` of None disables polling."""
+        self.csv_path = csv_path
+        self.snapshot = initial
+        self.reload = reload
+        self.interval = interval
+        self.reloads = 0
+        self.last_error = None
+        self._signature = file_signature(csv_path)
+        self._lock = threading.Lock()  # serialises writers only
+        self._stop = threading.Event()
+        if interval:
+            threading.Thread(target=self._poll, name="catalog-watcher", daemon=True).start()
+
+    def update(self, fn):
+        """Apply ``fn(snapshot) -> snapshot`` and publish the result."""
+        with self._lock:
+            new = fn(self.snapshot)
+            if new is not self.snapshot:
+                self.snapshot = new
+                self.reloads += 1
+            return new
+
+    def check(self):
+        """Reload if the CSV changed since the last check; returns True if it did."""
+        signature = file_signature(self.csv_path)
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            self.update(self.reload)
+            self.last_error = None
+        except Exception as e:
+            # Keep serving the previous snapshot; a half-saved CSV will be
+            # picked up again on its next write.
+            self.last_error = e
+            print(f"⚠️ Catalog reload failed: {e}", flush=True)
+        return True
+
+    def _poll(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def stop(self):
+        self._stop.set()
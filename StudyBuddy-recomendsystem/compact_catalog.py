@@ -0,0 +1,151 @@
+# compact_catalog.py - Compact, read-only resource catalog for StudyBuddy
+#
+# Replaces the object-dtype DataFrame on the lookup path:
+#   * topic / type are interned into small vocabularies + int32 id arrays
+#   * titles and links live in one UTF-8 blob, addressed by int64 offsets
+# A catalog can be written to a single binary file and opened with mmap,
+# so several Streamlit replicas share one read-only copy in the page cache:
+#
+#   python compact_catalog.py resources.csv resources.cat
+#
+# File layout: 8-byte magic, uint64 header length, JSON header (vocabularies
+# and section offsets), then the 8-byte aligned arrays and the blob.
+import json
+import mmap
+import struct
+import sys
+
+import numpy as np
+
+MAGIC = b"SBCAT01\0"
+_ALIGN = 8
+
+
+def _intern(values):
+    vocab, ids = {}, np.empty(len(values), dtype=np.int32)
+    for i, v in enumerate(values):
+        ids[i] = vocab.setdefault(v, len(vocab))
+    return list(vocab), ids
+
+
+def _pack(strings):
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return b"".join(encoded), offsets
+
+
+class CompactCatalog:
+    def __init__(self, topics, topic_ids, types, type_ids, title_offsets, link_offsets, blob, _mmap=None):
+        """``topic_ids[r]`` indexes ``topics`` (-1 for rows without a topic)."""
+        self.topics = topics
+        self.topic_ids = topic_ids
+        self.types = types
+        self.type_ids = type_ids
+        self.title_offsets = title_offsets
+        self.link_offsets = link_offsets
+        self.blob = blob
+        self._mmap = _mmap
+        # Display form is computed once per vocabulary entry, not per hit.
+        self._type_labels = [t.title() for t in types]
+
+    @classmethod
+    def from_df(cls, df):
+        import pandas as pd
+        codes, topics = pd.factorize(df["topic"])
+        types, type_ids = _intern([str(v) for v in df["type"].tolist()])
+        titles = [str(v) for v in df["title"].tolist()]
+        links = [str(v) for v in df["link"].tolist()]
+        title_blob, title_offsets = _pack(titles)
+        link_blob, link_offsets = _pack(links)
+        link_offsets += len(title_blob)
+        return cls([str(t) for t in topics], codes.astype(np.int32), types, type_ids,
+                   title_offsets, link_offsets, memoryview(title_blob + link_blob))
+
+    def __len__(self):
+        return len(self.topic_ids)
+
+    def title_bytes(self, i: int):
+        return self.blob[self.title_offsets[i]:self.title_offsets[i + 1]]
+
+    def link_bytes(self, i: int):
+        return self.blob[self.link_offsets[i]:self.link_offsets[i + 1]]
+
+    def title(self, i: int) -> str:
+        return str(self.title_bytes(i), "utf-8")
+
+    def link(self, i: int) -> str:
+        return str(self.link_bytes(i), "utf-8")
+
+    def topic(self, i: int):
+        code = self.topic_ids[i]
+        return self.topics[code] if code >= 0 else None
+
+    def type_label(self, i: int) -> str:
+        return self._type_labels[self.type_ids[i]]
+
+    def values(self, field: str):
+        """Per-row strings for ``field``, as str(value) of the original CSV cell."""
+        if field == "topic":
+            return [self.topics[c] if c >= 0 else "nan" for c in self.topic_ids]
+        if field == "type":
+            return [self.types[c] for c in self.type_ids]
+        if field == "title":
+            return [self.title(i) for i in range(len(self))]
+        if field == "link":
+            return [self.link(i) for i in range(len(self))]
+        raise KeyError(field)
+
+    # ---- binary file ----
+    def save(self, path: str):
+        arrays = {
+            "topic_ids": self.topic_ids,
+            "type_ids": self.type_ids,
+            "title_offsets": self.title_offsets,
+            "link_offsets": self.link_offsets,
+        }
+        sections, pos = {}, 0
+        for name, arr in arrays.items():
+            sections[name] = [pos, arr.dtype.str, len(arr)]
+            pos += -(-arr.nbytes // _ALIGN) * _ALIGN
+        sections["blob"] = [pos, "|u1", len(self.blob)]
+        header = json.dumps({"n": len(self), "topics": self.topics, "types": self.types,
+                             "sections": sections}).encode("utf-8")
+        header += b" " * (-(len(MAGIC) + 8 + len(header)) % _ALIGN)
+        with open(path, "wb") as f:
+            f.write(MAGIC + struct.pack("<Q", len(header)) + header)
+            for arr in arrays.values():
+                data = np.ascontiguousarray(arr).tobytes()
+                f.write(data + b"\0" * (-len(data) % _ALIGN))
+            f.write(self.blob)
+
+    @classmethod
+    def open(cls, path: str):
+        """Map a catalog file read-only; arrays and blob are views into the mapping."""
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a StudyBuddy catalog file")
+        (header_len,) = struct.unpack_from("<Q", mm, len(MAGIC))
+        start = len(MAGIC) + 8
+        header = json.loads(mm[start:start + header_len])
+        base = start + header_len
+
+        def section(name):
+            offset, dtype, count = header["sections"][name]
+            return np.frombuffer(mm, dtype=np.dtype(dtype), count=count, offset=base + offset)
+
+        blob_offset, _, blob_len = header["sections"]["blob"]
+        blob = memoryview(mm)[base + blob_offset:base + blob_offset + blob_len]
+        return cls(header["topics"], section("topic_ids"), header["types"], section("type_ids"),
+                   section("title_offsets"), section("link_offsets"), blob, _mmap=mm)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python compact_catalog.py resources.csv resources.cat")
+    import pandas as pd
+    df = pd.read_csv(sys.argv[1])
+    df.columns = [c.strip().lower() for c in df.columns]
+    CompactCatalog.from_df(df).save(sys.argv[2])
+    print(f"✅ Wrote {len(df)} rows to {sys.argv[2]}")
@@ -0,0 +1,89 @@
+# embedding_cache.py - On-disk embedding cache for StudyBuddy
+#
+# Embeddings are kept in a memory-mapped ``.npy`` sidecar next to the CSV
+# (``resources.emb.npy``) with a small JSON index (``resources.emb.json``)
+# that records the model name and one content hash per stored row.  On
+# startup only rows whose text is new or changed are encoded; everything
+# else is read straight from the mapped file.
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(str(text).encode("utf-8")).hexdigest()
+
+
+def sidecar_paths(csv_path: str):
+    base, _ = os.path.splitext(csv_path)
+    return base + ".emb.npy", base + ".emb.json"
+
+
+def _load_sidecar(npy_path, meta_path, model_name):
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("model") != model_name:
+            return None, []
+        vectors = np.load(npy_path, mmap_mode="r")
+        keys = meta.get("keys", [])
+        if vectors.ndim != 2 or len(keys) != vectors.shape[0]:
+            return None, []
+        return vectors, keys
+    except (OSError, ValueError):
+        return None, []
+
+
+def _write_sidecar(npy_path, meta_path, model_name, vectors, keys):
+    # Write to temp files and swap them in, so a crash never leaves a
+    # half-written cache behind.  The temp names are per process, so two
+    # processes refreshing the same cache never write into one file.
+    tmp_npy, tmp_meta = f"{npy_path}.{os.getpid()}.tmp", f"{meta_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_npy, "wb") as f:
+            np.save(f, np.ascontiguousarray(vectors, dtype=np.float32))
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump({"model": model_name, "dim": int(vectors.shape[1]), "keys": keys}, f)
+        os.replace(tmp_npy, npy_path)
+        os.replace(tmp_meta, meta_path)
+    finally:
+        for tmp in (tmp_npy, tmp_meta):
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+
+def encode_with_cache(model, texts, model_name: str, csv_path: str = "resources.csv"):
+    """Return embeddings for ``texts``, encoding only rows missing from the cache."""
+    npy_path, meta_path = sidecar_paths(csv_path)
+    keys = [content_hash(t) for t in texts]
+
+    cached, cached_keys = _load_sidecar(npy_path, meta_path, model_name)
+    if cached is not None and cached_keys == keys:
+        return cached  # unchanged catalog: zero-copy view of the mapped file
+
+    position = {k: i for i, k in enumerate(cached_keys)}
+    missing = [i for i, k in enumerate(keys) if k not in position]
+
+    fresh = None
+    if missing:
+        # Rows with identical text share one encode call.
+        uniq = list(dict.fromkeys(keys[i] for i in missing))
+        first = {}
+        for i in missing:
+            first.setdefault(keys[i], i)
+        encoded = np.asarray(model.encode([texts[first[k]] for k in uniq]), dtype=np.float32)
+        fresh = dict(zip(uniq, encoded))
+
+    dim = cached.shape[1] if cached is not None else next(iter(fresh.values())).shape[0] if fresh else 0
+    out = np.empty((len(keys), dim), dtype=np.float32)
+    for i, k in enumerate(keys):
+        out[i] = cached[position[k]] if k in position else fresh[k]
+
+    if keys:
+        try:
+            _write_sidecar(npy_path, meta_path, model_name, out, keys)
+        except OSError:
+            pass  # read-only deploys still work, they just re-encode next time
+    return out
@@ -0,0 +1,80 @@
+# fuzzy_index.py - Fuzzy fallback matcher for StudyBuddy
+#
+# Used when the sentence-transformers model is unavailable.  Built once at
+# load time over the lowercased catalog strings:
+#   * duplicate strings (the CSV repeats topics) are scored only once
+#   * a character inverted index (char -> topic ids + counts) prunes
+#     strings that cannot possibly reach the threshold
+#   * survivors are scored with the same fuzz.partial_ratio as before
+#
+# Pruning is lossless.  partial_ratio compares the shorter string (length
+# m) against windows of at most m characters of the longer one and
+# returns round(100 * 2M / (m + len(window))), where M is the number of
+# matched characters.  Since M <= len(window), a score >= t needs
+# M >= m * (t - 0.5) / (200 - (t - 0.5)), and M can never exceed the
+# character-multiset overlap of the two strings.  Longer n-grams give no
+# such guarantee at a threshold of 70, so single characters are indexed.
+from collections import Counter
+
+import numpy as np
+from fuzzywuzzy import fuzz
+
+
+class FuzzyMatcher:
+    def __init__(self, df, fields=("topic",)):
+        self._build([df[field].tolist() for field in fields if field in df.columns])
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Build from per-row value lists, one list per field to match."""
+        matcher = cls.__new__(cls)
+        matcher._build(columns)
+        return matcher
+
+    def _build(self, columns):
+        strings, string_rows = {}, []
+        for values in columns:
+            for row_idx, value in enumerate(values):
+                text = str(value).lower()
+                sid = strings.setdefault(text, len(strings))
+                if sid == len(string_rows):
+                    string_rows.append([])
+                string_rows[sid].append(row_idx)
+
+        self.strings = list(strings)
+        self.string_rows = [np.unique(rows) for rows in string_rows]
+        self.lengths = np.array([len(s) for s in self.strings], dtype=np.int64)
+
+        postings = {}
+        for sid, text in enumerate(self.strings):
+            for ch, n in Counter(text).items():
+                postings.setdefault(ch, ([], []))
+                postings[ch][0].append(sid)
+                postings[ch][1].append(n)
+        self.postings = {
+            ch: (np.array(ids, dtype=np.int64), np.array(counts, dtype=np.int64))
+            for ch, (ids, counts) in postings.items()
+        }
+
+    def candidates(self, query: str, threshold: int = 70):
+        """Ids of strings whose character overlap could reach ``threshold``."""
+        overlap = np.zeros(len(self.strings), dtype=np.int64)
+        for ch, n in Counter(query).items():
+            if ch in self.postings:
+                ids, counts = self.postings[ch]
+                overlap[ids] += np.minimum(counts, n)
+        t = threshold - 0.5
+        need = np.minimum(self.lengths, len(query)) * (t / (200 - t))
+        return np.flatnonzero(overlap >= need - 1e-9)
+
+    def match(self, query: str, threshold: int = 70):
+        """Row indices whose field scores ``partial_ratio >= threshold``, in CSV order."""
+        query = query.lower()
+        hits = [
+            self.string_rows[sid]
+            for sid in self.candidates(query, threshold)
+            if fuzz.partial_ratio(query, self.strings[sid]) >= threshold
+        ]
+        if not hits:
+            return []
+        return np.unique(np.concatenate(hits)).tolist()
@@ -0,0 +1,175 @@
+# metrics.py - Per-stage latency metrics for StudyBuddy
+#
+# Stage timers (histograms), event counters and cache hit/miss stats,
+# exposed as a Prometheus text endpoint and/or a periodic log line:
+#
+#   with metrics.timer("encode"):
+#       ...
+#   metrics.inc("recommend")
+#   metrics.add_cache("youtube", cache.stats)
+#
+# Disabled (the default) ``timer`` hands back one shared no-op context
+# manager and ``inc`` returns immediately, so instrumented code costs a
+# method call and an attribute check per stage.
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds in seconds, from an in-memory search to a slow Gemini call.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNTER_STATS = ("hits", "misses", "coalesced")
+_NULL = nullcontext()
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "errors")
+
+    def __init__(self, n_buckets: int):
+        self.counts = [0] * (n_buckets + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.errors = 0
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.name, time.perf_counter() - self.start, failed=exc_type is not None)
+        return False
+
+
+class Metrics:
+    def __init__(self, enabled: bool = False, buckets=DEFAULT_BUCKETS, prefix: str = "studybuddy"):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self._stages = {}
+        self._events = {}
+        self._caches = {}
+        self._lock = threading.Lock()
+
+    # ---- recording ----
+    def timer(self, stage: str):
+        """Context manager timing one run of ``stage``; exceptions count as errors."""
+        if not self.enabled:
+            return _NULL
+        return _Timer(self, stage)
+
+    def observe(self, stage: str, seconds: float, failed: bool = False):
+        if not self.enabled:
+            return
+        with self._lock:
+            hist = self._stages.get(stage)
+            if hist is None:
+                hist = self._stages[stage] = _Histogram(len(self.buckets))
+            hist.counts[bisect_left(self.buckets, seconds)] += 1
+            hist.total += seconds
+            hist.errors += failed
+
+    def inc(self, event: str, n: int = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._events[event] = self._events.get(event, 0) + n
+
+    def add_cache(self, name: str, stats):
+        """Register ``stats() -> dict`` (e.g. TTLCache.stats), read at export time."""
+        with self._lock:
+            self._caches[name] = stats
+
+    # ---- export ----
+    def _snapshot(self):
+        with self._lock:
+            stages = {name: (list(h.counts), h.total, h.errors) for name, h in self._stages.items()}
+            events = dict(self._events)
+            caches = dict(self._caches)
+        cache_stats = {}
+        for name, stats in caches.items():
+            try:
+                cache_stats[name] = stats()
+            except Exception:
+                pass
+        return stages, events, cache_stats
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        stages, events, caches = self._snapshot()
+        p = self.prefix
+        lines = [f"# TYPE {p}_stage_seconds histogram"]
+        for name, (counts, total, _errors) in sorted(stages.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                lines.append(f'{p}_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{p}_stage_seconds_sum{{stage="{name}"}} {total:.6f}')
+            lines.append(f'{p}_stage_seconds_count{{stage="{name}"}} {cumulative}')
+        lines.append(f"# TYPE {p}_stage_errors_total counter")
+        lines += [f'{p}_stage_errors_total{{stage="{name}"}} {errors}'
+                  for name, (_c, _t, errors) in sorted(stages.items())]
+        lines.append(f"# TYPE {p}_events_total counter")
+        lines += [f'{p}_events_total{{event="{name}"}} {n}' for name, n in sorted(events.items())]
+        keys = sorted({k for stats in caches.values() for k, v in stats.items() if isinstance(v, (int, float))})
+        for key in keys:
+            metric = f"{p}_cache_{key}_total" if key in COUNTER_STATS else f"{p}_cache_{key}"
+            lines.append(f"# TYPE {metric} {'counter' if key in COUNTER_STATS else 'gauge'}")
+            lines += [f'{metric}{{cache="{name}"}} {stats[key]}'
+                      for name, stats in sorted(caches.items()) if key in stats]
+        return "\n".join(lines) + "\n"
+
+    def log_line(self) -> str:
+        stages, events, caches = self._snapshot()
+        parts = [
+            f"{name} {sum(counts)}x avg {1000 * total / max(1, sum(counts)):.1f}ms"
+            + (f" ({errors} failed)" if errors else "")
+            for name, (counts, total, errors) in sorted(stages.items())
+        ]
+        parts += [f"{name} {n}" for name, n in sorted(events.items())]
+        parts += [f"{name} cache {100 * stats.get('hit_ratio', 0):.0f}% hit"
+                  for name, stats in sorted(caches.items())]
+        return "[metrics] " + (" | ".join(parts) or "no samples yet")
+
+    # ---- exporters ----
+    def serve(self, port: int, host: str = "0.0.0.0"):
+        """Serve ``render()`` at http://host:port/metrics on a daemon thread."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        return server
+
+    def log_every(self, interval: float):
+        """Print ``log_line()`` every ``interval`` seconds on a daemon thread."""
+        def loop():
+            while True:
+                time.sleep(interval)
+                print(self.log_line(), flush=True)
+        threading.Thread(target=loop, name="metrics-log", daemon=True).start()
+
+
+# One registry per server process; the app enables it from its config.
+metrics = Metrics()
@@ -0,0 +1,171 @@
+# notes_cache.py - Shared cache for AI-generated study notes
+#
+# Notes are cached across all Streamlit sessions, keyed by the normalised
+# topic, the video title and the prompt version.  Concurrent requests for
+# the same key share one in-flight generation (single-flight) instead of
+# each calling Gemini.  The generator is any object with a
+# ``generate(prompt) -> str`` method (plus ``stream(prompt)`` yielding
+# text chunks for streaming mode), so tests can pass FakeNotesClient.
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+PROMPT_VERSION = "v1"  # bump when the prompt changes to invalidate cached notes
+
+
+def build_prompt(topic: str, video_title: str | None = None) -> str:
+    focus = f" based on '{video_title}'" if video_title else ""
+    return (
+        f"Create short, beginner-friendly study notes on '{topic}'{focus}.\n"
+        "- Use ## Headings (3–5)\n"
+        "- Bullet points with tiny examples\n"
+        "- Max 250 words\n"
+        "- End with 3 practice questions (as '❓ Q1:')\n"
+        "- Use simple language."
+    )
+
+
+class GeminiNotesClient:
+    def __init__(self, model_name: str = "gemini-1.5-flash"):
+        self.model_name = model_name
+
+    def generate(self, prompt: str) -> str:
+        import google.generativeai as genai
+        resp = genai.GenerativeModel(self.model_name).generate_content(prompt)
+        return getattr(resp, "text", "No notes generated.")
+
+    def stream(self, prompt: str):
+        import google.generativeai as genai
+        resp = genai.GenerativeModel(self.model_name).generate_content(prompt, stream=True)
+        for chunk in resp:
+            text = getattr(chunk, "text", "")
+            if text:
+                yield text
+
+
+class FakeNotesClient:
+    """Offline stand-in for GeminiNotesClient: echoes the prompt in chunks."""
+
+    def __init__(self, chunks: int = 5, delay: float = 0.0):
+        self.chunks = chunks
+        self.delay = delay
+        self.calls = 0
+
+    def stream(self, prompt: str):
+        self.calls += 1
+        words = f"## Notes\n{prompt}".split(" ")
+        step = max(1, len(words) // self.chunks)
+        for i in range(0, len(words), step):
+            time.sleep(self.delay)
+            yield " ".join(words[i:i + step]) + " "
+
+    def generate(self, prompt: str) -> str:
+        return "".join(self.stream(prompt))
+
+
+def notes_key(topic: str, video_title: str | None, prompt_version: str = PROMPT_VERSION) -> str:
+    norm = lambda s: " ".join((s or "").lower().split())
+    return f"{prompt_version}|{norm(topic)}|{norm(video_title)}"
+
+
+class NotesCache:
+    def __init__(self, generator, store, prompt_version: str = PROMPT_VERSION):
+        """``store`` is a TTLCache (in-process LRU, optionally SQLite-backed)."""
+        self.generator = generator
+        self.store = store
+        self.prompt_version = prompt_version
+        self.hits = 0       # served from the store
+        self.misses = 0     # generated (this request led the call)
+        self.coalesced = 0  # joined someone else's in-flight call
+        self.timings = deque(maxlen=256)  # (time to first token, total) per streamed generation
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key):
+        """(cached text, None, False), or the in-flight future and whether
+        this request leads (generates) it."""
+        cached = self.store.get(key, count=False)
+        with self._lock:
+            if cached is None:
+                future = self._inflight.get(key)
+                if future is not None:
+                    self.coalesced += 1
+                    return None, future, False
+                # The previous leader stores its text before leaving
+                # _inflight, so look again before generating a duplicate.
+                cached = self.store.get(key, count=False)
+                if cached is None:
+                    self.misses += 1
+                    future = self._inflight[key] = Future()
+                    return None, future, True
+            self.hits += 1
+            return cached, None, False
+
+    def get(self, topic: str, video_title: str | None = None) -> str:
+        key = notes_key(topic, video_title, self.prompt_version)
+        cached, future, leader = self._join(key)
+        if cached is not None:
+            return cached
+        if not leader:
+            return future.result()
+
+        try:
+            text = self.generator.generate(build_prompt(topic, video_title))
+            self.store.set(key, text)  # failures raise below and are not cached
+            future.set_result(text)
+            return text
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stream(self, topic: str, video_title: str | None = None):
+        """Yield note chunks as they are generated; the full text is cached
+        only once the generation completes."""
+        key = notes_key(topic, video_title, self.prompt_version)
+        cached, future, leader = self._join(key)
+        if cached is not None:
+            yield cached
+            return
+        if not leader:
+            yield future.result()
+            return
+
+        parts, ttft = [], None
+        start = time.perf_counter()
+        try:
+            for chunk in self.generator.stream(build_prompt(topic, video_title)):
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                parts.append(chunk)
+                yield chunk
+            text = "".join(parts)
+            self.timings.append((ttft if ttft is not None else 0.0, time.perf_counter() - start))
+            self.store.set(key, text)
+            future.set_result(text)
+        except GeneratorExit:
+            # The consumer stopped early (e.g. a Streamlit rerun); waiters
+            # must not hang on the abandoned call.
+            future.set_exception(RuntimeError("Notes generation was interrupted."))
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self):
+        stats = self.store.stats()
+        with self._lock:
+            total = self.hits + self.misses + self.coalesced
+            stats.update(hits=self.hits, misses=self.misses, coalesced=self.coalesced,
+                         hit_ratio=(self.hits + self.coalesced) / total if total else 0.0)
+        if self.timings:
+            ttfts, totals = zip(*self.timings)
+            stats["avg_ttft_s"] = sum(ttfts) / len(ttfts)
+            stats["avg_generation_s"] = sum(totals) / len(totals)
+        return stats
@@ -0,0 +1,103 @@
+# pdf_export.py - Favorites PDF export for StudyBuddy
+#
+# The PDF is rendered only on request and saved to a file named after a
+# digest of the favorites list, so an unchanged list is never rendered twice
+# (across reruns and sessions) and the bytes are not kept in Streamlit's
+# caches or session state.  FPDF 1.7.2 has no incremental writer: output()
+# still builds the whole document in memory before writing it.
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "studybuddy_pdf")
+MAX_CACHED_FILES = 64
+CACHE_TTL_SEC = 3600      # exports unused for this long are deleted
+HANDOUT_GRACE_SEC = 600   # never delete a file handed out this recently, even over MAX_CACHED_FILES
+
+
+def available() -> bool:
+    """True if fpdf is installed."""
+    import importlib.util
+    return importlib.util.find_spec("fpdf") is not None
+
+
+def favorites_digest(favorites) -> str:
+    fields = [[r["title"], r["type"], r["source"], r["url"]] for r in favorites]
+    return hashlib.sha1(json.dumps(fields, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _latin1(text: str) -> str:
+    return text.encode('latin1', 'ignore').decode('latin1')
+
+
+def write_favorites_pdf(favorites, path: str):
+    """Render ``favorites`` to ``path``. Raises ImportError without fpdf."""
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(0, 10, "My StudyBuddy Favorites", ln=True, align='C')
+    pdf.ln(10)
+
+    pdf.set_font("Arial", "", 12)
+    if favorites:
+        for r in favorites:
+            title = _latin1(r['title'].replace('•', '').replace('●', '').strip())
+
+            pdf.set_font("Arial", "B", 12)
+            pdf.cell(0, 8, f"- {title}", ln=True)
+
+            pdf.set_font("Arial", "I", 11)
+            pdf.set_text_color(26, 188, 156)
+            pdf.cell(0, 6, f"Type: {_latin1(r['type'])} | Source: {_latin1(r['source'].title())}", ln=True)
+
+            pdf.set_text_color(0, 0, 0)
+            pdf.set_font("Arial", "U", 10)
+            pdf.cell(0, 6, _latin1(r['url']), ln=True)
+            pdf.ln(4)
+    else:
+        pdf.cell(0, 10, "No favorites yet.", ln=True)
+
+    pdf.output(path)
+
+
+def _prune(cache_dir: str, keep: int, ttl: float = CACHE_TTL_SEC, grace: float = HANDOUT_GRACE_SEC):
+    # A file's mtime is refreshed whenever it is handed out, so a session's
+    # pending (deferred) download is never pruned from under it.
+    now = time.time()
+    files = []
+    for f in os.listdir(cache_dir):
+        if f.endswith(".pdf"):
+            try:
+                files.append((os.path.getmtime(os.path.join(cache_dir, f)), os.path.join(cache_dir, f)))
+            except OSError:
+                pass
+    files.sort(reverse=True)
+    for i, (mtime, path) in enumerate(files):
+        age = now - mtime
+        if age > ttl or (i >= keep and age > grace):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def favorites_pdf(favorites, cache_dir: str = DEFAULT_CACHE_DIR, max_files: int = MAX_CACHED_FILES) -> str:
+    """Path of the PDF for ``favorites``, rendering it only on a cache miss."""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"{favorites_digest(favorites)}.pdf")
+    if os.path.exists(path):
+        os.utime(path)  # keep recently used exports out of the prune
+        return path
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        write_favorites_pdf(favorites, tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    _prune(cache_dir, max_files)
+    return path
@@ -0,0 +1,42 @@
+# ranking.py - Top-k ranking of catalog rows for StudyBuddy
+#
+# Scoring happens once per *unique* topic (the CSV repeats topics across
+# rows), then the best topics fan out to every row that carries them via
+# a precomputed topic -> row-index map stored CSR style (offsets + rows).
+import numpy as np
+
+from vector_index import build_index
+
+DEFAULT_TOP_K = 3
+DEFAULT_THRESHOLD = 0.6
+
+
+class TopicRanker:
+    def __init__(self, topics, topic_embeddings, topic_codes, index_kind: str = "auto", **index_kwargs):
+        """``topics[i]`` has embedding ``topic_embeddings[i]``; ``topic_codes[r]``
+        is the topic id of CSV row ``r`` (-1 for rows without a topic)."""
+        codes = np.asarray(topic_codes, dtype=np.int64)
+        valid = np.flatnonzero(codes >= 0)
+        order = valid[np.argsort(codes[valid], kind="stable")]
+        self.topics = list(topics)
+        self.rows = order
+        self.offsets = np.zeros(len(self.topics) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes[valid], minlength=len(self.topics)), out=self.offsets[1:])
+        self.index = build_index(topic_embeddings, kind=index_kind, **index_kwargs)
+
+    def rows_for(self, topic_id: int):
+        return self.rows[self.offsets[topic_id]:self.offsets[topic_id + 1]]
+
+    def rank(self, query_embeddings, k: int = DEFAULT_TOP_K, threshold: float = DEFAULT_THRESHOLD):
+        """Return, per query, a list of ``(row_index, score)`` for the rows of
+        the ``k`` best topics scoring above ``threshold``, best topic first."""
+        scores, ids = self.index.search(query_embeddings, k=k)
+        results = []
+        for q_scores, q_ids in zip(scores, ids):
+            hits = []
+            for score, topic_id in zip(q_scores, q_ids):
+                if topic_id < 0 or score <= threshold:
+                    break
+                hits.extend((int(r), float(score)) for r in self.rows_for(topic_id))
+            results.append(hits)
+        return results
@@ -0,0 +1,159 @@
+# recommender.py - Streamlit-free loading and matching for StudyBuddy
+#
+# Shared by the Streamlit app (which wraps these in st.cache_resource and
+# turns exceptions into st.error messages) and by batch_recommend.py.
+import os
+from typing import NamedTuple
+
+from compact_catalog import CompactCatalog
+from embedding_cache import content_hash, encode_with_cache
+from metrics import metrics
+from warmup import startup_profile
+
+REQUIRED_COLUMNS = {"topic", "type", "title", "link"}
+DEFAULT_CSV = "resources.csv"
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+
+
+class Catalog(NamedTuple):
+    """An immutable snapshot of everything a query needs.
+
+    Reloads build a new Catalog and swap it in whole, so a query that
+    grabbed a snapshot keeps a consistent resources / ranker / matcher."""
+    resources: CompactCatalog
+    fuzzy_matcher: object
+    row_hashes: list
+    model: object = None
+    ranker: object = None
+    model_error: str | None = None  # why the model could not be loaded
+
+
+def row_hashes(resources: CompactCatalog):
+    cols = [resources.values(f) for f in ("topic", "title", "type", "link")]
+    return [content_hash("\x1f".join(row)) for row in zip(*cols)]
+
+
+def _read_csv(csv_path: str) -> CompactCatalog:
+    with startup_profile.phase("import pandas"):
+        import pandas as pd
+    with startup_profile.phase("load catalog"):
+        df = pd.read_csv(csv_path)
+    df.columns = [c.strip().lower() for c in df.columns]
+    if not REQUIRED_COLUMNS.issubset(df.columns):
+        raise ValueError(f"CSV missing columns. Required: {REQUIRED_COLUMNS}")
+    # The DataFrame is only a build step; lookups use the compact catalog.
+    return CompactCatalog.from_df(df)
+
+
+def _load_resources(csv_path: str, compact_path: str | None) -> CompactCatalog:
+    if not compact_path:
+        return _read_csv(csv_path)
+    if os.path.exists(compact_path) and (
+        not os.path.exists(csv_path) or os.path.getmtime(compact_path) > os.path.getmtime(csv_path)
+    ):
+        return CompactCatalog.open(compact_path)
+    resources = _read_csv(csv_path)
+    tmp = f"{compact_path}.{os.getpid()}.tmp"
+    resources.save(tmp)
+    os.replace(tmp, compact_path)
+    # Re-open mapped so this process shares the file pages with the others.
+    return CompactCatalog.open(compact_path)
+
+
+def load_catalog(csv_path: str = DEFAULT_CSV, fuzzy_fields=("topic",), compact_path: str | None = None):
+    """Load the resources and build the fuzzy fallback matcher.
+
+    With ``compact_path`` the catalog is memory-mapped from that binary
+    file, which is (re)built from the CSV when missing or older.
+    Raises FileNotFoundError if the CSV is missing and ValueError if it
+    lacks one of REQUIRED_COLUMNS.
+    """
+    from fuzzy_index import FuzzyMatcher
+    resources = _load_resources(csv_path, compact_path)
+    # Fallback matcher is built up front so it works even without the model
+    with startup_profile.phase("build fuzzy matcher"):
+        fuzzy_matcher = FuzzyMatcher.from_columns([resources.values(f) for f in fuzzy_fields])
+    return Catalog(resources, fuzzy_matcher, row_hashes(resources))
+
+
+def load_embedding_model(model_name: str = DEFAULT_MODEL):
+    with startup_profile.phase("import sentence_transformers"):
+        from sentence_transformers import SentenceTransformer
+    with startup_profile.phase("load model"):
+        return SentenceTransformer(model_name)
+
+
+def build_ranker(resources: CompactCatalog, model, model_name: str = DEFAULT_MODEL,
+                 csv_path: str = DEFAULT_CSV, index_kind: str = "auto", previous=None):
+    """Build a TopicRanker for ``resources``. Only topics missing from the
+    embedding cache are encoded; an IVF ``previous`` ranker lends its
+    trained centroids."""
+    from ranking import TopicRanker
+    from vector_index import IVFIndex
+    with startup_profile.phase("encode topics"):
+        topic_embeddings = encode_with_cache(model, resources.topics, model_name, csv_path)
+    index_kwargs = {}
+    if previous is not None and isinstance(previous.index, IVFIndex) and previous.index.nlist:
+        index_kind, index_kwargs = "ivf", {"centroids": previous.index.centroids}
+    with startup_profile.phase("build index"):
+        return TopicRanker(resources.topics, topic_embeddings, resources.topic_ids,
+                           index_kind=index_kind, **index_kwargs)
+
+
+def attach_model(catalog: Catalog, model, model_name: str = DEFAULT_MODEL,
+                 csv_path: str = DEFAULT_CSV, index_kind: str = "auto"):
+    ranker = build_ranker(catalog.resources, model, model_name, csv_path, index_kind, previous=catalog.ranker)
+    return catalog._replace(model=model, ranker=ranker)
+
+
+def reload_catalog(catalog: Catalog, csv_path: str = DEFAULT_CSV, model_name: str = DEFAULT_MODEL,
+                   index_kind: str = "auto", fuzzy_fields=("topic",), compact_path: str | None = None):
+    """Re-read the CSV; returns ``catalog`` unchanged if no row differs."""
+    fresh = load_catalog(csv_path, fuzzy_fields, compact_path)
+    if fresh.row_hashes == catalog.row_hashes:
+        return catalog
+    old = set(catalog.row_hashes)
+    changed = sum(h not in old for h in fresh.row_hashes)
+    print(f"🔄 {csv_path}: {changed} new/changed rows, {len(fresh.row_hashes)} total", flush=True)
+    if catalog.model is None:
+        return fresh
+    return attach_model(fresh._replace(ranker=catalog.ranker), catalog.model, model_name, csv_path, index_kind)
+
+
+def load_resources_and_model(csv_path: str = DEFAULT_CSV, model_name: str = DEFAULT_MODEL,
+                             index_kind: str = "auto", fuzzy_fields=("topic",),
+                             compact_path: str | None = None):
+    """Return a Catalog; its model and ranker are None (and model_error
+    says why) when sentence-transformers cannot be loaded."""
+    catalog = load_catalog(csv_path, fuzzy_fields, compact_path)
+    try:
+        model = load_embedding_model(model_name)
+        return attach_model(catalog, model, model_name, csv_path, index_kind)
+    except Exception as e:
+        return catalog._replace(model_error=f"{type(e).__name__}: {e}")
+
+
+def row_to_rec(resources: CompactCatalog, row_idx: int, score: float | None = None):
+    rec = {
+        "source": "csv",
+        "type": resources.type_label(row_idx),
+        "title": resources.title(row_idx),
+        "url": resources.link(row_idx)
+    }
+    if score is not None:
+        rec["score"] = round(score, 4)
+    return rec
+
+
+def find_resources(query: str, catalog: Catalog, k: int = 3, threshold: float = 0.6, fuzzy_threshold: int = 70):
+    if catalog.model is not None and catalog.ranker is not None:
+        # AI: Semantic similarity
+        with metrics.timer("encode"):
+            query_embeddings = catalog.model.encode([query])
+        with metrics.timer("search"):
+            hits = catalog.ranker.rank(query_embeddings, k=k, threshold=threshold)[0]
+        return [row_to_rec(catalog.resources, row_idx) for row_idx, _score in hits]
+    # Fallback: Fuzzy match
+    with metrics.timer("fuzzy"):
+        matches = catalog.fuzzy_matcher.match(query, threshold=fuzzy_threshold)
+    return [row_to_rec(catalog.resources, row_idx) for row_idx in matches]
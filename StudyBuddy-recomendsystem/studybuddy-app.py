@@ -1,10 +1,17 @@
 # studybuddy.py - Full AI-Powered StudyBuddy
+# Heavy libraries (pandas, sentence-transformers, Gemini, requests) are
+# imported on first use; the embedding model warms up in the background.
 import os
-import streamlit as st
-import pandas as pd
-from fuzzywuzzy import fuzz
-import requests
-import google.generativeai as genai
+import queue
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from warmup import ModelWarmup, startup_profile
+from catalog_watcher import CatalogWatcher
+from metrics import metrics
+import pdf_export
+import recommender
+with startup_profile.phase("import streamlit"):
+    import streamlit as st
 
 # ---------------- CONFIG ----------------
 st.set_page_config(page_title="StudyBuddy", page_icon="📚", layout="centered")
@@ -13,10 +20,43 @@ st.set_page_config(page_title="StudyBuddy", page_icon="📚", layout="centered")
 YOUTUBE_API_KEY = st.secrets.get("YOUTUBE_API_KEY", os.getenv("YOUTUBE_API_KEY", "REPLACE_ME_YT"))
 GEMINI_API_KEY = st.secrets.get("GEMINI_API_KEY", os.getenv("GEMINI_API_KEY", "REPLACE_ME_GEMINI"))
 
-# Configure Gemini
-if "REPLACE_ME" not in GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-else:
+# Catalog + embedding model (embeddings are cached in resources.emb.npy)
+RESOURCES_CSV = "resources.csv"
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+VECTOR_INDEX = os.getenv("STUDYBUDDY_VECTOR_INDEX", "auto")         # exact | ivf | auto
+TOP_K = int(os.getenv("STUDYBUDDY_TOP_K", "3"))                      # best topics to return
+SIM_THRESHOLD = float(os.getenv("STUDYBUDDY_SIM_THRESHOLD", "0.6"))  # min cosine similarity
+FUZZY_THRESHOLD = 70                                                 # fallback partial_ratio cutoff
+FUZZY_FIELDS = ("topic",)                                            # add "title" to match titles too
+LAZY_MODEL = os.getenv("STUDYBUDDY_LAZY_MODEL", "1") != "0"          # paint UI first, load model in background
+CATALOG_BIN = os.getenv("STUDYBUDDY_CATALOG_BIN")                    # optional mmap-shared compact catalog file
+CATALOG_POLL_SEC = float(os.getenv("STUDYBUDDY_RELOAD_SEC", "2"))     # hot-reload poll interval, 0 = off
+MODEL_ERROR = "Failed to load AI model. Run: pip install sentence-transformers"
+
+# YouTube search cache (set YOUTUBE_CACHE_DB to a file path to keep it across restarts)
+YOUTUBE_API_URL = os.getenv("YOUTUBE_API_URL", "https://www.googleapis.com/youtube/v3/search")
+YOUTUBE_CACHE_SIZE = int(os.getenv("YOUTUBE_CACHE_SIZE", "1024"))
+YOUTUBE_CACHE_TTL = float(os.getenv("YOUTUBE_CACHE_TTL", str(6 * 3600)))
+YOUTUBE_CACHE_DB = os.getenv("YOUTUBE_CACHE_DB")
+
+# Gemini notes cache (set NOTES_CACHE_DB to a file path to keep it across restarts)
+GEMINI_MODEL = "gemini-1.5-flash"
+NOTES_CACHE_SIZE = int(os.getenv("NOTES_CACHE_SIZE", "512"))
+NOTES_CACHE_TTL = float(os.getenv("NOTES_CACHE_TTL", str(7 * 24 * 3600)))
+NOTES_CACHE_DB = os.getenv("NOTES_CACHE_DB")
+STREAM_NOTES = os.getenv("STUDYBUDDY_STREAM_NOTES", "1") != "0"  # render notes as they are generated
+NOTES_REFRESH_SEC = 0.1
+
+# Recommend pipeline: worker threads and per-stage time budgets (seconds)
+PIPELINE_WORKERS = int(os.getenv("STUDYBUDDY_WORKERS", "16"))
+STAGE_TIMEOUTS = {"resources": 10, "youtube": 15, "notes": 30}
+
+# Metrics
+METRICS_PORT = int(os.getenv("STUDYBUDDY_METRICS_PORT", "0"))           # Prometheus /metrics port, 0 = off
+METRICS_LOG_SEC = float(os.getenv("STUDYBUDDY_METRICS_LOG_SEC", "0"))   # periodic metrics log line, 0 = off
+
+# Gemini is configured lazily in get_notes_cache()
+if "REPLACE_ME" in GEMINI_API_KEY:
     st.warning("Gemini API key missing. Notes generation disabled.")
 
 # Warn if YouTube key missing
@@ -51,131 +91,153 @@ html, body, .stApp {
 """, unsafe_allow_html=True)
 
 # ---------------- HELPERS ----------------
-def safe_get(dct, *path, default=None):
-    cur = dct
-    for key in path:
-        if isinstance(cur, dict) and key in cur:
-            cur = cur[key]
-        else:
-            return default
-    return cur
+@st.cache_resource
+def get_youtube_client():
+    # Shared by every Streamlit session: one keep-alive connection pool and
+    # one response cache per server process.
+    from ttl_cache import TTLCache
+    from youtube_client import YouTubeClient
+    cache = TTLCache(maxsize=YOUTUBE_CACHE_SIZE, ttl=YOUTUBE_CACHE_TTL, sqlite_path=YOUTUBE_CACHE_DB)
+    metrics.add_cache("youtube", cache.stats)
+    return YouTubeClient(YOUTUBE_API_KEY, cache=cache, api_url=YOUTUBE_API_URL)
 
-def get_youtube_videos(query: str, max_results: int = 3):
-    if "REPLACE_ME" in YOUTUBE_API_KEY:
-        st.error("YouTube API key missing.")
-        return []
-    try:
-        url = (
-            "https://www.googleapis.com/youtube/v3/search"
-            f"?part=snippet&type=video&maxResults={max_results}"
-            f"&q={requests.utils.quote(query)}&key={YOUTUBE_API_KEY}"
-        )
-        r = requests.get(url, timeout=15)
-        r.raise_for_status()
-        data = r.json()
-        videos = []
-        for item in data.get("items", []):
-            vid = safe_get(item, "id", "videoId")
-            title = safe_get(item, "snippet", "title", default="(No Title)")
-            if not vid:
-                continue
-            thumb = safe_get(item, "snippet", "thumbnails", "high", "url") or f"https://img.youtube.com/vi/{vid}/0.jpg"
-            videos.append({
-                "title": title,
-                "url": f"https://www.youtube.com/watch?v={vid}",
-                "thumb": thumb
-            })
-        return videos
-    except Exception as e:
-        st.error(f"YouTube error: {e}")
-        return []
+@st.cache_resource
+def get_notes_cache():
+    # Shared by every Streamlit session, so each topic/video pair is
+    # generated once per server rather than once per user.
+    import google.generativeai as genai
+    from notes_cache import GeminiNotesClient, NotesCache
+    from ttl_cache import TTLCache
+    genai.configure(api_key=GEMINI_API_KEY)
+    store = TTLCache(maxsize=NOTES_CACHE_SIZE, ttl=NOTES_CACHE_TTL, sqlite_path=NOTES_CACHE_DB)
+    notes_cache = NotesCache(GeminiNotesClient(GEMINI_MODEL), store)
+    metrics.add_cache("notes", notes_cache.stats)
+    return notes_cache
 
-def generate_ai_notes(topic: str, video_title: str | None = None):
+def generate_ai_notes(topic: str, video_title: str | None = None, cache=None):
     if "REPLACE_ME" in GEMINI_API_KEY:
         return "Gemini API key missing. Cannot generate notes."
     try:
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        focus = f" based on '{video_title}'" if video_title else ""
-        prompt = (
-            f"Create short, beginner-friendly study notes on '{topic}'{focus}.\n"
-            "- Use ## Headings (3–5)\n"
-            "- Bullet points with tiny examples\n"
-            "- Max 250 words\n"
-            "- End with 3 practice questions (as '❓ Q1:')\n"
-            "- Use simple language."
-        )
-        resp = model.generate_content(prompt)
-        return getattr(resp, "text", "No notes generated.")
+        return (cache or get_notes_cache()).get(topic, video_title)
     except Exception as e:
         return f"Error: {e}"
 
+def generate_ai_notes_stream(topic: str, video_title: str | None = None, cache=None):
+    # Yields note chunks as Gemini produces them (cached text arrives as one chunk).
+    if "REPLACE_ME" in GEMINI_API_KEY:
+        yield "Gemini API key missing. Cannot generate notes."
+        return
+    try:
+        yield from (cache or get_notes_cache()).stream(topic, video_title)
+    except Exception as e:
+        yield f"Error: {e}"
+
+def stream_notes_into(slot, chunks):
+    text = ""
+    for chunk in chunks:
+        text += chunk
+        slot.markdown(f"<div class='notes'>{text}▌</div>", unsafe_allow_html=True)
+    return text
+
 # ---------------- PDF EXPORT HELPER ----------------
-def create_pdf_favorites():
+def create_pdf_favorites(favorites):
+    # Path of the rendered PDF; reuses the file when the list is unchanged.
     try:
-        from fpdf import FPDF
+        with metrics.timer("pdf"):
+            return pdf_export.favorites_pdf(favorites)
     except ImportError:
         st.error("Install fpdf: `pip install fpdf`")
         return None
 
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", "B", 16)
-    pdf.cell(0, 10, "My StudyBuddy Favorites", ln=True, align='C')
-    pdf.ln(10)
-
-    pdf.set_font("Arial", "", 12)
-    if st.session_state.favorites:
-        for r in st.session_state.favorites:
-            title = r['title'].replace('•', '').replace('●', '').replace('▶', '▶').strip()
-            title = title.encode('latin1', 'ignore').decode('latin1')
-
-            pdf.set_font("Arial", "B", 12)
-            pdf.cell(0, 8, f"- {title}", ln=True)
-
-            pdf.set_font("Arial", "I", 11)
-            pdf.set_text_color(26, 188, 156)
-            type_text = r['type'].encode('latin1', 'ignore').decode('latin1')
-            source_text = r['source'].title().encode('latin1', 'ignore').decode('latin1')
-            pdf.cell(0, 6, f"Type: {type_text} | Source: {source_text}", ln=True)
-
-            pdf.set_text_color(0, 0, 0)
-            pdf.set_font("Arial", "U", 10)
-            url = r['url'].encode('latin1', 'ignore').decode('latin1')
-            pdf.cell(0, 6, url, ln=True)
-            pdf.ln(4)
-    else:
-        pdf.cell(0, 10, "No favorites yet.", ln=True)
+def favorites_pdf_bytes(favorites):
+    # Deferred download data: runs on a Streamlit thread only when the button
+    # is clicked, so it must not call st.*.
+    with metrics.timer("pdf"):
+        path = pdf_export.favorites_pdf(favorites)
+    with open(path, "rb") as f:
+        return f.read()
+
+def deferred_downloads_supported():
+    # Newer Streamlit accepts a callable as download_button data and calls it
+    # on click; older versions (incl. the pinned 1.29) need the bytes up front.
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    return hasattr(MediaFileManager, "add_deferred")
+
+# ---------------- METRICS ----------------
+@st.cache_resource
+def start_metrics():
+    # One exporter per server process, shared by every session.
+    metrics.enabled = bool(METRICS_PORT or METRICS_LOG_SEC)
+    if METRICS_PORT:
+        metrics.serve(METRICS_PORT)
+    if METRICS_LOG_SEC:
+        metrics.log_every(METRICS_LOG_SEC)
+    return metrics
 
-    return pdf.output(dest="S")
+start_metrics()
 
 # ---------------- LOAD RESOURCES & AI MODEL ----------------
 @st.cache_resource
-def load_resources_and_model():
+def load_resources():
+    # Fast part of startup: the catalog and the fuzzy fallback matcher.
     try:
-        df = pd.read_csv("resources.csv")
-        df.columns = [c.strip().lower() for c in df.columns]
-        required = {"topic", "type", "title", "link"}
-        if not required.issubset(df.columns):
-            st.error(f"CSV missing columns. Required: {required}")
-            return None, None, None
-        topics = df["topic"].dropna().tolist()
+        return recommender.load_catalog(RESOURCES_CSV, fuzzy_fields=FUZZY_FIELDS, compact_path=CATALOG_BIN)
     except FileNotFoundError:
         st.warning("⚠️ `resources.csv` not found.")
-        return None, None, None
+    except ValueError as e:
+        st.error(str(e))
     except Exception as e:
         st.error(f"Error loading CSV: {e}")
-        return None, None, None
+    return None
 
-    try:
-        from sentence_transformers import SentenceTransformer
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-        topic_embeddings = model.encode(topics)
-        return df, model, topic_embeddings
-    except Exception as e:
-        st.error("Failed to load AI model. Run: pip install sentence-transformers")
-        return df, None, None
+def reload_catalog(catalog):
+    return recommender.reload_catalog(catalog, RESOURCES_CSV, EMBEDDING_MODEL, VECTOR_INDEX, FUZZY_FIELDS, CATALOG_BIN)
+
+@st.cache_resource
+def get_catalog_watcher():
+    # Holds the live catalog snapshot and hot-reloads resources.csv when it changes.
+    initial = load_resources()
+    if initial is None:
+        return None
+    return CatalogWatcher(RESOURCES_CSV, initial, reload_catalog, interval=CATALOG_POLL_SEC or None)
 
-df, embedding_model, topic_embeddings = load_resources_and_model()
+def load_model(watcher):
+    # Slow part of startup: embedding model, topic embeddings and index. Raises on failure.
+    model = recommender.load_embedding_model(EMBEDDING_MODEL)
+    return watcher.update(
+        lambda catalog: recommender.attach_model(catalog, model, EMBEDDING_MODEL, RESOURCES_CSV, VECTOR_INDEX)
+    )
+
+@st.cache_resource
+def load_resources_and_model():
+    watcher = get_catalog_watcher()
+    if watcher is not None:
+        try:
+            load_model(watcher)
+        except Exception as e:
+            st.error(MODEL_ERROR)
+    return watcher
+
+@st.cache_resource
+def start_model_warmup(_watcher):
+    # Loads the model on a background thread; one warm-up per server process.
+    return ModelWarmup(load_model, _watcher)
+
+if LAZY_MODEL:
+    watcher = get_catalog_watcher()
+    if watcher is not None:
+        warmup = start_model_warmup(watcher)
+        if warmup.error is not None:
+            st.error(MODEL_ERROR)
+        elif not warmup.ready.is_set():
+            st.caption("🧠 Warming up the AI model, using quick fuzzy matching meanwhile.")
+else:
+    watcher = load_resources_and_model()
+    startup_profile.mark("model ready")
+
+# One snapshot per script run, so a reload landing mid-run can't mix catalogs
+catalog = watcher.snapshot if watcher is not None else None
+resources = catalog.resources if catalog is not None else None
 
 # Initialize session state
 if "topic_input" not in st.session_state:
@@ -190,6 +252,9 @@ if "search_history" not in st.session_state:
 if "favorites" not in st.session_state:
     st.session_state.favorites = []
 
+if "pending_notes" not in st.session_state:
+    st.session_state.pending_notes = {}
+
 # ---------------- UI ----------------
 st.markdown('<div class="heading">StudyBuddy</div>', unsafe_allow_html=True)
 
@@ -209,6 +274,7 @@ with st.form("query"):
 if clear:
     st.session_state.recs = []
     st.session_state.topic_input = ""
+    st.session_state.pending_notes = {}
     for key in list(st.session_state.keys()):
         if key.startswith("notes_"):
             del st.session_state[key]
@@ -223,57 +289,134 @@ if topic_val and topic_val not in st.session_state.search_history:
     st.session_state.search_history.append(topic_val)
     st.session_state.search_history = st.session_state.search_history[-5:]
 
-# ---------------- SEARCH LOGIC (AI Semantic Match) ----------------
-if go and topic_val and df is not None:
-    recs = []
-
-    # AI: Semantic similarity
-    if embedding_model is not None and topic_embeddings is not None:
-        try:
-            from sklearn.metrics.pairwise import cosine_similarity
-            import numpy as np
-            user_embedding = embedding_model.encode([topic_val])
-            similarities = cosine_similarity(user_embedding, np.array(topic_embeddings))
-            best_idx = similarities.argmax()
-            best_score = similarities[0][best_idx]
-
-            if best_score > 0.6:
-                row = df.iloc[best_idx]
-                recs.append({
-                    "source": "csv",
-                    "type": str(row["type"]).title(),
-                    "title": str(row["title"]),
-                    "url": str(row["link"])
-                })
-        except Exception as e:
-            st.error(f"AI matching error: {e}")
-    else:
-        # Fallback: Fuzzy match
-        for _, row in df.iterrows():
+# ---------------- SEARCH LOGIC (concurrent pipeline) ----------------
+# The resource match, YouTube search and Gemini notes run on a shared
+# thread pool. Notes wait only for YouTube (they use the first video
+# title), never for the resource match. Each stage streams into its tab
+# as soon as it finishes. A stage that overruns its budget is reported
+# in its tab instead of holding up the rest. Workers never call st.*;
+# all rendering happens on the script thread.
+@st.cache_resource
+def get_executor():
+    return ThreadPoolExecutor(max_workers=PIPELINE_WORKERS, thread_name_prefix="studybuddy")
+
+def find_resources(query: str, catalog):
+    return recommender.find_resources(
+        query, catalog, k=TOP_K, threshold=SIM_THRESHOLD, fuzzy_threshold=FUZZY_THRESHOLD
+    )
+
+def fetch_videos(client, query: str):
+    with metrics.timer("youtube"):
+        videos = client.search(query, max_results=3)
+    return [{
+        "source": "youtube",
+        "type": "YouTube",
+        "title": v["title"],
+        "url": v["url"],
+        "thumb": v["thumb"]
+    } for v in videos]
+
+def start_pipeline(query: str, catalog):
+    executor = get_executor()
+    futures = {"resources": executor.submit(find_resources, query, catalog)}
+    yt_future = None
+    if "REPLACE_ME" not in YOUTUBE_API_KEY:
+        yt_future = executor.submit(fetch_videos, get_youtube_client(), query)
+        futures["youtube"] = yt_future
+    notes_cache = get_notes_cache() if "REPLACE_ME" not in GEMINI_API_KEY else None
+
+    def notes_stage(chunk_queue):
+        video_title = None
+        if yt_future is not None:
             try:
-                row_topic = str(row.get("topic", "")).lower()
-                if fuzz.partial_ratio(topic_val.lower(), row_topic) >= 70:
-                    recs.append({
-                        "source": "csv",
-                        "type": str(row.get("type", "Resource")).title(),
-                        "title": str(row.get("title", "(No Title)")),
-                        "url": str(row.get("link", ""))
-                    })
-            except:
+                videos = yt_future.result(timeout=STAGE_TIMEOUTS["youtube"])
+                video_title = videos[0]["title"] if videos else None
+            except Exception:
+                pass
+        with metrics.timer("notes"):
+            if not STREAM_NOTES:
+                return generate_ai_notes(query, video_title, cache=notes_cache)
+            parts = []
+            for chunk in generate_ai_notes_stream(query, video_title, cache=notes_cache):
+                parts.append(chunk)
+                chunk_queue.put(chunk)
+            return "".join(parts)
+
+    chunk_queue = queue.Queue()
+    futures["notes"] = executor.submit(notes_stage, chunk_queue)
+    return futures, chunk_queue
+
+def render_stage_preview(slot, name, value):
+    with slot.container():
+        if name == "resources":
+            for r in value:
+                st.markdown(f"📎 **{r['type']}**: [{r['title']}]({r['url']})")
+            if not value:
+                st.info("No matching resources found.")
+        elif name == "youtube":
+            for r in value:
+                st.markdown(f"▶️ [{r['title']}]({r['url']})")
+            if not value:
+                st.info("No YouTube videos found.")
+        else:
+            st.markdown(f"<div class='notes'>{value}</div>", unsafe_allow_html=True)
+
+def run_pipeline(query: str, catalog, slots):
+    futures, chunk_queue = start_pipeline(query, catalog)
+    results = {}
+    notes_text = ""
+    start = time.monotonic()
+    pending = dict(futures)
+    while pending:
+        if "notes" in pending and not chunk_queue.empty():
+            while not chunk_queue.empty():
+                notes_text += chunk_queue.get_nowait()
+            slots["notes"].markdown(f"<div class='notes'>{notes_text}▌</div>", unsafe_allow_html=True)
+        elapsed = time.monotonic() - start
+        for name in [n for n in pending if elapsed >= STAGE_TIMEOUTS[n]]:
+            pending.pop(name)
+            metrics.inc(f"{name}_timeout")
+            slots[name].warning(f"⏱️ {name.title()} is taking too long, showing the rest first.")
+        if not pending:
+            break
+        budget = min(STAGE_TIMEOUTS[n] for n in pending) - elapsed
+        if STREAM_NOTES and "notes" in pending:
+            budget = min(budget, NOTES_REFRESH_SEC)
+        done, _ = wait(pending.values(), timeout=max(budget, 0), return_when=FIRST_COMPLETED)
+        for name, fut in list(pending.items()):
+            if fut not in done:
                 continue
+            pending.pop(name)
+            try:
+                results[name] = fut.result()
+                render_stage_preview(slots[name], name, results[name])
+            except Exception as e:
+                label = "AI matching" if name == "resources" else name.title()
+                slots[name].error(f"{label} error: {e}")
+    return futures, results
+
+if go and topic_val and resources is not None:
+    if "REPLACE_ME" in YOUTUBE_API_KEY:
+        st.error("YouTube API key missing.")
 
-    # YouTube videos
-    yt = get_youtube_videos(topic_val, max_results=3)
-    for v in yt:
-        recs.append({
-            "source": "youtube",
-            "type": "YouTube",
-            "title": v["title"],
-            "url": v["url"],
-            "thumb": v["thumb"]
-        })
+    live_tabs = st.tabs(["📚 Resources", "🎬 YouTube", "📝 AI Notes"])
+    slots = {"resources": live_tabs[0].empty(), "youtube": live_tabs[1].empty(), "notes": live_tabs[2].empty()}
+    for slot in slots.values():
+        slot.info("⏳ Loading...")
 
-    st.session_state.recs = recs
+    with metrics.timer("recommend"):
+        futures, results = run_pipeline(topic_val, catalog, slots)
+
+    notes_key = f"notes_{topic_val}"
+    if "notes" in results:
+        st.session_state[notes_key] = results["notes"]
+    else:
+        # Keep the slow generation running; the AI Notes tab picks it up later.
+        st.session_state.pending_notes[notes_key] = futures["notes"]
+
+    st.session_state.recs = results.get("resources", []) + results.get("youtube", [])
+    if st.session_state.recs:
+        st.rerun()
 
 # ---------------- DISPLAY ----------------
 if st.session_state.recs:
@@ -325,37 +468,77 @@ if st.session_state.recs:
     with tabs[2]:
         st.subheader("📝 AI-Generated Notes")
         notes_key = f"notes_{topic_val}"
-        if notes_key not in st.session_state:
+        pending = st.session_state.pending_notes.get(notes_key)
+        if notes_key not in st.session_state and pending is not None and pending.done():
+            st.session_state.pending_notes.pop(notes_key)
+            try:
+                st.session_state[notes_key] = pending.result()
+            except Exception as e:
+                st.session_state[notes_key] = f"Error: {e}"
+        elif notes_key not in st.session_state and pending is None:
             yt_items = [r for r in st.session_state.recs if r["source"] == "youtube"]
             video_title = yt_items[0]["title"] if yt_items else None
-            st.session_state[notes_key] = generate_ai_notes(topic_val, video_title)
-
-        st.markdown(f"<div class='notes'>{st.session_state[notes_key]}</div>", unsafe_allow_html=True)
-
-        st.download_button(
-            "📥 Download Notes",
-            st.session_state[notes_key],
-            file_name=f"{topic_val.replace(' ', '_')}_study_notes.txt",
-            mime="text/plain"
-        )
+            if STREAM_NOTES:
+                live = st.empty()
+                st.session_state[notes_key] = stream_notes_into(live, generate_ai_notes_stream(topic_val, video_title))
+                live.empty()
+            else:
+                st.session_state[notes_key] = generate_ai_notes(topic_val, video_title)
+
+        if notes_key in st.session_state:
+            st.markdown(f"<div class='notes'>{st.session_state[notes_key]}</div>", unsafe_allow_html=True)
+
+            st.download_button(
+                "📥 Download Notes",
+                st.session_state[notes_key],
+                file_name=f"{topic_val.replace(' ', '_')}_study_notes.txt",
+                mime="text/plain"
+            )
+        else:
+            st.info("⏳ Notes are still being generated...")
+            st.button("🔄 Check again", key="refresh_notes")
 
     # --- TAB 4: FAVORITES ---
     with tabs[3]:
         st.subheader("⭐ Your Favorites")
         if st.session_state.favorites:
-            try:
-                pdf_data = create_pdf_favorites()
-                if pdf_data:
-                    st.download_button(
-                        "📄 Export Favorites as PDF",
-                        pdf_data,
-                        file_name="my_study_favorites.pdf",
-                        mime="application/pdf"
-                    )
-                else:
-                    st.info("PDF export not available. Install `fpdf`.")
-            except Exception as e:
-                st.error(f"PDF generation failed: {e}")
+            # The PDF is rendered only when asked for and cached on disk by
+            # pdf_export. FPDF 1.7.2 still builds each document in memory.
+            favorites = list(st.session_state.favorites)
+            if not pdf_export.available():
+                st.warning("PDF export not available. Install `fpdf`.")
+            elif deferred_downloads_supported():
+                # The file is only rendered/read when the button is clicked.
+                st.download_button(
+                    "📥 Download Favorites PDF",
+                    lambda: favorites_pdf_bytes(favorites),
+                    file_name="my_study_favorites.pdf",
+                    mime="application/pdf"
+                )
+            else:
+                # Older Streamlit copies the file's bytes into its media
+                # store on every rerun, so the button only appears once the
+                # user asks for an export.
+                digest = pdf_export.favorites_digest(favorites)
+                pdf_path = st.session_state.get("favorites_pdf")
+                if pdf_path and os.path.basename(pdf_path) == f"{digest}.pdf" and os.path.exists(pdf_path):
+                    with open(pdf_path, "rb") as pdf_file:
+                        st.download_button(
+                            "📥 Download Favorites PDF",
+                            pdf_file,
+                            file_name="my_study_favorites.pdf",
+                            mime="application/pdf"
+                        )
+                elif st.button("📄 Export Favorites as PDF"):
+                    try:
+                        pdf_path = create_pdf_favorites(favorites)
+                        if pdf_path:
+                            st.session_state.favorites_pdf = pdf_path
+                            st.rerun()
+                        else:
+                            st.info("PDF export not available. Install `fpdf`.")
+                    except Exception as e:
+                        st.error(f"PDF generation failed: {e}")
 
             st.markdown("<br>", unsafe_allow_html=True)
             for r in st.session_state.favorites:
@@ -385,3 +568,5 @@ if st.session_state.recs:
 else:
     if 'go' in locals() and go:
         st.info("No results. Try a broader topic like 'Python basics' or 'SQL joins'.")
+
+startup_profile.mark("first paint")
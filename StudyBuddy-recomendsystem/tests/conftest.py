@@ -0,0 +1,5 @@
+# The StudyBuddy modules are flat files next to studybuddy-app.py.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,125 @@
+# test_notes_cache.py - shared notes cache and single-flight generation
+import threading
+import time
+
+import pytest
+
+from notes_cache import FakeNotesClient, NotesCache, notes_key
+from ttl_cache import TTLCache
+
+
+class GatedClient(FakeNotesClient):
+    """Blocks inside generate() until ``release`` is set."""
+
+    def __init__(self, fail: bool = False):
+        super().__init__()
+        self.release = threading.Event()
+        self.fail = fail
+
+    def generate(self, prompt):
+        self.calls += 1
+        self.release.wait(5)
+        if self.fail:
+            raise RuntimeError("quota exceeded")
+        return f"notes for {prompt[:20]}"
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def run_concurrently(n, target):
+    results = [None] * n
+
+    def worker(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    return threads, results
+
+
+def test_concurrent_requests_share_one_generation():
+    client = GatedClient()
+    notes = NotesCache(client, TTLCache())
+    threads, results = run_concurrently(8, lambda: notes.get("Python", "Intro video"))
+    wait_for(lambda: notes.coalesced == 7)
+    client.release.set()
+    for t in threads:
+        t.join()
+
+    assert client.calls == 1
+    assert len(set(results)) == 1 and isinstance(results[0], str)
+    stats = notes.stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 7, 0)
+
+
+def test_later_requests_hit_the_store():
+    client = FakeNotesClient()
+    notes = NotesCache(client, TTLCache())
+    first = notes.get("Python")
+    assert notes.get("  python ") == first
+    assert client.calls == 1
+    assert (notes.hits, notes.misses) == (1, 1)
+
+
+def test_recheck_under_lock_avoids_duplicate_generation():
+    # A request that missed the store just before the previous leader saved
+    # its text (and left _inflight) must not generate the notes again.
+    class LateStore(TTLCache):
+        stale = True
+
+        def get(self, key, default=None, count=True):
+            if self.stale:
+                self.stale = False
+                return default
+            return super().get(key, default, count)
+
+    client = FakeNotesClient()
+    store = LateStore()
+    store.set(notes_key("Rust", None), "cached notes")
+    notes = NotesCache(client, store)
+    assert notes.get("Rust") == "cached notes"
+    assert client.calls == 0 and notes.hits == 1
+
+
+def test_failure_reaches_waiters_and_is_not_cached():
+    client = GatedClient(fail=True)
+    notes = NotesCache(client, TTLCache())
+    threads, results = run_concurrently(3, lambda: notes.get("SQL"))
+    wait_for(lambda: notes.coalesced == 2)
+    client.release.set()
+    for t in threads:
+        t.join()
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    client.fail = False
+    assert notes.get("SQL").startswith("notes for")
+    assert client.calls == 2
+
+
+def test_keys_include_topic_video_and_prompt_version():
+    assert notes_key("Machine  Learning", None) == notes_key("machine learning", "")
+    assert notes_key("ML", "Video A") != notes_key("ML", "Video B")
+    assert notes_key("ML", None, "v1") != notes_key("ML", None, "v2")
+
+    client = FakeNotesClient()
+    store = TTLCache()
+    NotesCache(client, store, prompt_version="v1").get("ML")
+    NotesCache(client, store, prompt_version="v2").get("ML")
+    assert client.calls == 2
+
+
+def test_stats_hit_ratio_counts_coalesced_requests():
+    notes = NotesCache(FakeNotesClient(), TTLCache())
+    assert notes.stats()["hit_ratio"] == 0.0
+    notes.get("Go")
+    notes.get("Go")
+    assert notes.stats()["hit_ratio"] == pytest.approx(0.5)
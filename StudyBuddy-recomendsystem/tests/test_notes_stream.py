@@ -0,0 +1,50 @@
+# test_notes_stream.py - streaming notes generation
+import threading
+import time
+
+from notes_cache import FakeNotesClient, NotesCache, build_prompt, notes_key
+from ttl_cache import TTLCache
+
+
+def test_stream_yields_chunks_then_caches_the_full_text():
+    client = FakeNotesClient(chunks=4)
+    notes = NotesCache(client, TTLCache())
+    chunks = list(notes.stream("Docker"))
+    text = "".join(chunks)
+    assert len(chunks) > 1
+    assert text == FakeNotesClient(chunks=4).generate(build_prompt("Docker"))
+
+    assert list(notes.stream("docker")) == [text]
+    assert notes.get("Docker") == text
+    assert client.calls == 1
+    ttft, total = notes.timings[-1]
+    assert 0 <= ttft <= total
+    assert "avg_ttft_s" in notes.stats()
+
+
+def test_abandoned_stream_is_not_cached_and_releases_waiters():
+    client = FakeNotesClient(chunks=4)
+    notes = NotesCache(client, TTLCache())
+    stream = notes.stream("Kotlin")
+    next(stream)
+
+    errors = []
+
+    def wait_for_notes():
+        try:
+            notes.get("Kotlin")
+        except RuntimeError as e:
+            errors.append(e)
+
+    waiter = threading.Thread(target=wait_for_notes)
+    waiter.start()
+    deadline = time.monotonic() + 5
+    while notes.coalesced < 1 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    stream.close()  # e.g. a Streamlit rerun stops consuming
+    waiter.join(5)
+    assert not waiter.is_alive() and len(errors) == 1
+
+    assert notes.store.get(notes_key("Kotlin", None)) is None
+    assert "".join(notes.stream("Kotlin"))
+    assert client.calls == 2
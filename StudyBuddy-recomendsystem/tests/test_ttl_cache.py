@@ -0,0 +1,83 @@
+# test_ttl_cache.py - expiry, LRU eviction and SQLite write-through
+import pytest
+
+import ttl_cache
+from ttl_cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ttl_cache, "time", clock)
+    return clock
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = TTLCache(ttl=10)
+    cache.set("a", 1)
+    clock.now += 9.9
+    assert cache.get("a") == 1
+    clock.now += 0.2
+    assert cache.get("a") is None
+    assert cache.get("a", "gone") == "gone"
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_is_evicted(clock):
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now the least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_overwrite_refreshes_ttl(clock):
+    cache = TTLCache(ttl=10)
+    cache.set("a", 1)
+    clock.now += 8
+    cache.set("a", 2)
+    clock.now += 8
+    assert cache.get("a") == 2
+
+
+def test_hit_and_miss_counters(clock):
+    cache = TTLCache()
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+    cache.get("a", count=False)
+    cache.get("b", count=False)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+
+def test_sqlite_survives_restart_but_not_expiry(clock, tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = TTLCache(ttl=10, sqlite_path=path)
+    cache.set("a", {"videos": [1, 2]})
+    cache.set("b", "short")
+
+    restarted = TTLCache(ttl=10, sqlite_path=path)
+    assert restarted.get("a") == {"videos": [1, 2]}
+    clock.now += 11
+    assert TTLCache(ttl=10, sqlite_path=path).get("b") is None
+
+
+def test_clear_drops_memory_and_sqlite(clock, tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = TTLCache(sqlite_path=path)
+    cache.set("a", 1)
+    cache.clear()
+    assert cache.get("a") is None
+    assert TTLCache(sqlite_path=path).get("a") is None
@@ -0,0 +1,172 @@
+# vector_index.py - In-process vector search for StudyBuddy
+#
+# Two interchangeable backends, both scoring by cosine similarity
+# (dot product of L2-normalised vectors):
+#   * ExactIndex - brute force, one matrix-vector product per query
+#   * IVFIndex   - inverted-file ANN: vectors are bucketed by a k-means
+#                  coarse quantizer and a query only scans the `nprobe`
+#                  closest buckets
+# Both expose ``search(queries, k) -> (scores, ids)`` with rows sorted by
+# descending score.
+import numpy as np
+
+# Catalogs smaller than this are searched exactly; above it IVF is used.
+AUTO_IVF_THRESHOLD = 50_000
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k(scores, k):
+    """Indices of the k largest scores, best first, without a full sort."""
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.shape[0]:
+        idx = np.argpartition(-scores, k - 1)[:k]
+    else:
+        idx = np.arange(scores.shape[0])
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+
+def _pad(results, k):
+    scores = np.full((len(results), k), -np.inf, dtype=np.float32)
+    ids = np.full((len(results), k), -1, dtype=np.int64)
+    for row, (s, i) in enumerate(results):
+        scores[row, :len(s)] = s
+        ids[row, :len(i)] = i
+    return scores, ids
+
+
+class ExactIndex:
+    def __init__(self, embeddings):
+        self.vectors = normalize(embeddings)
+
+    def __len__(self):
+        return self.vectors.shape[0]
+
+    def search(self, queries, k: int = 5):
+        queries = normalize(queries)
+        if len(self) == 0:
+            return _pad([(np.empty(0), np.empty(0, dtype=np.int64))] * len(queries), k)
+        sims = queries @ self.vectors.T
+        results = []
+        for row in sims:
+            idx = top_k(row, k)
+            results.append((row[idx], idx))
+        return _pad(results, k)
+
+
+class IVFIndex:
+    def __init__(self, embeddings, nlist: int | None = None, nprobe: int = 8,
+                 iters: int = 10, train_size: int = 100_000, seed: int = 0, centroids=None):
+        vectors = normalize(embeddings)
+        n = vectors.shape[0]
+        if centroids is not None:
+            # Reuse an already trained quantizer (incremental rebuilds skip k-means).
+            self.centroids = normalize(centroids)
+            self.nlist = self.centroids.shape[0]
+            self.nprobe = min(nprobe, self.nlist)
+        elif n == 0:
+            # Nothing to cluster: no buckets, so every search comes back empty.
+            self.nlist, self.nprobe = 0, 0
+            self.centroids = np.empty((0, vectors.shape[1]), dtype=np.float32)
+        else:
+            self.nlist = max(1, min(n, nlist or int(np.sqrt(n))))
+            self.nprobe = min(nprobe, self.nlist)
+            rng = np.random.default_rng(seed)
+            sample = vectors[rng.choice(n, min(n, train_size), replace=False)]
+            self.centroids = self._train(sample, iters, rng)
+
+        assign = self._assign(vectors)
+        order = np.argsort(assign, kind="stable")
+        # Each bucket is stored contiguously so a probe is a single slice.
+        self.vectors = np.ascontiguousarray(vectors[order])
+        self.ids = order.astype(np.int64)
+        self.offsets = np.zeros(self.nlist + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=self.nlist), out=self.offsets[1:])
+
+    def __len__(self):
+        return self.vectors.shape[0]
+
+    def _train(self, sample, iters, rng):
+        centroids = sample[rng.choice(len(sample), self.nlist, replace=False)].copy()
+        for _ in range(iters):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            counts = np.bincount(assign, minlength=self.nlist)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            centroids = normalize(sums)
+        return centroids
+
+    def _assign(self, vectors, chunk: int = 65_536):
+        out = np.empty(vectors.shape[0], dtype=np.int64)
+        for start in range(0, vectors.shape[0], chunk):
+            out[start:start + chunk] = np.argmax(vectors[start:start + chunk] @ self.centroids.T, axis=1)
+        return out
+
+    def search(self, queries, k: int = 5, nprobe: int | None = None):
+        queries = normalize(queries)
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        if nprobe == 0 or k <= 0:
+            return _pad([(np.empty(0), np.empty(0, dtype=np.int64))] * len(queries), k)
+        # Group the batch by bucket: each probed bucket is scored against
+        # all the queries that probe it with one matrix multiply, keeping
+        # each query's best k per bucket.
+        centroid_scores = queries @ self.centroids.T
+        if nprobe < self.nlist:
+            probes = np.argpartition(-centroid_scores, nprobe - 1, axis=1)[:, :nprobe]
+        else:
+            probes = np.broadcast_to(np.arange(self.nlist), (len(queries), self.nlist))
+        # Candidate slots: query q's p-th probe fills columns [p*k, p*k + k).
+        q_idx = np.repeat(np.arange(len(queries)), nprobe)
+        slot = np.tile(np.arange(nprobe), len(queries))
+        buckets = probes.ravel()
+        order = np.argsort(buckets, kind="stable")
+        q_idx, slot, buckets = q_idx[order], slot[order], buckets[order]
+        cand_scores = np.full((len(queries), nprobe * k), -np.inf, dtype=np.float32)
+        cand_ids = np.full((len(queries), nprobe * k), -1, dtype=np.int64)
+        for group in np.split(np.arange(len(buckets)), np.flatnonzero(np.diff(buckets)) + 1):
+            c = buckets[group[0]]
+            lo, hi = self.offsets[c], self.offsets[c + 1]
+            if hi == lo:
+                continue
+            qs = q_idx[group]
+            sims = queries[qs] @ self.vectors[lo:hi].T
+            if hi - lo > k:
+                top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+                sims = np.take_along_axis(sims, top, axis=1)
+            else:
+                top = np.broadcast_to(np.arange(hi - lo), sims.shape)
+            cols = slot[group][:, None] * k + np.arange(top.shape[1])
+            cand_scores[qs[:, None], cols] = sims
+            cand_ids[qs[:, None], cols] = self.ids[lo:hi][top]
+
+        if cand_scores.shape[1] > k:
+            best = np.argpartition(-cand_scores, k - 1, axis=1)[:, :k]
+            cand_scores = np.take_along_axis(cand_scores, best, axis=1)
+            cand_ids = np.take_along_axis(cand_ids, best, axis=1)
+        rank = np.argsort(-cand_scores, axis=1, kind="stable")
+        scores = np.take_along_axis(cand_scores, rank, axis=1)
+        # Unfilled slots stay (-inf, -1), the same padding _pad uses.
+        return scores, np.take_along_axis(cand_ids, rank, axis=1)
+
+
+def build_index(embeddings, kind: str = "auto", **kwargs):
+    """Build a vector index; ``kind`` is "exact", "ivf" or "auto"."""
+    if kind == "auto":
+        kind = "ivf" if len(embeddings) >= AUTO_IVF_THRESHOLD else "exact"
+    if kind == "exact":
+        return ExactIndex(embeddings)
+    if kind == "ivf":
+        return IVFIndex(embeddings, **kwargs)
+    raise ValueError(f"Unknown index kind: {kind}")
@@ -0,0 +1,72 @@
+# warmup.py - Cold-start helpers for StudyBuddy
+#
+# StartupProfile times the phases of a cold start (imports, CSV load,
+# model load, ...) and prints a one-off breakdown, e.g.
+#   [startup] first paint after 1.84s: import streamlit 0.91s | load catalog 0.12s ...
+# ModelWarmup runs a slow loader on a background thread so the UI can
+# render immediately.  For a per-module import breakdown run the app with
+# `python -X importtime -m streamlit run studybuddy-app.py`.
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+STARTUP_MARKS = ("model ready", "first paint")
+
+
+class StartupProfile:
+    def __init__(self, marks=STARTUP_MARKS, max_phases: int = 64):
+        """Phases stop being recorded once every label in ``marks`` has been
+        reported (catalog reloads would otherwise keep adding to them)."""
+        self.t0 = time.perf_counter()
+        self.marks = set(marks)
+        self.phases = deque(maxlen=max_phases)
+        self._reported = set()
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.marks <= self._reported
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                if not self.finished:
+                    self.phases.append((name, time.perf_counter() - start))
+
+    def mark(self, label: str):
+        """Print the phases recorded so far, once per label."""
+        with self._lock:
+            if label in self._reported:
+                return
+            self._reported.add(label)
+            phases = list(self.phases)
+            self.phases.clear()
+        breakdown = " | ".join(f"{name} {secs:.2f}s" for name, secs in phases)
+        print(f"[startup] {label} after {time.perf_counter() - self.t0:.2f}s: {breakdown}", flush=True)
+
+
+# One profile per server process (sibling modules are imported once).
+startup_profile = StartupProfile()
+
+
+class ModelWarmup:
+    def __init__(self, loader, *args):
+        self.value = None
+        self.error = None
+        self.ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(loader, *args), name="model-warmup", daemon=True)
+        self._thread.start()
+
+    def _run(self, loader, *args):
+        try:
+            self.value = loader(*args)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.ready.set()
+            startup_profile.mark("model ready")
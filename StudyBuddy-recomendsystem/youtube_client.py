@@ -0,0 +1,74 @@
+# youtube_client.py - Cached YouTube Data API search for StudyBuddy
+#
+# One pooled requests.Session (HTTP keep-alive) is shared by every search,
+# and results are cached by normalised query + max_results so repeated
+# popular searches skip the API call entirely.
+import requests
+from requests.adapters import HTTPAdapter
+
+YOUTUBE_SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
+
+
+def make_session(pool_size: int = 16):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def _safe_get(dct, *path, default=None):
+    cur = dct
+    for key in path:
+        if isinstance(cur, dict) and key in cur:
+            cur = cur[key]
+        else:
+            return default
+    return cur
+
+
+class YouTubeClient:
+    def __init__(self, api_key: str, cache=None, session=None,
+                 api_url: str = YOUTUBE_SEARCH_URL, timeout: float = 15):
+        self.api_key = api_key
+        self.cache = cache
+        self.session = session or make_session()
+        self.api_url = api_url
+        self.timeout = timeout
+
+    def search(self, query: str, max_results: int = 3):
+        """Return ``[{"title", "url", "thumb"}, ...]``; raises on HTTP errors."""
+        key = f"{normalize_query(query)}|{max_results}"
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        r = self.session.get(self.api_url, timeout=self.timeout, params={
+            "part": "snippet",
+            "type": "video",
+            "maxResults": max_results,
+            "q": query,
+            "key": self.api_key,
+        })
+        r.raise_for_status()
+        videos = []
+        for item in r.json().get("items", []):
+            vid = _safe_get(item, "id", "videoId")
+            title = _safe_get(item, "snippet", "title", default="(No Title)")
+            if not vid:
+                continue
+            thumb = _safe_get(item, "snippet", "thumbnails", "high", "url") or f"https://img.youtube.com/vi/{vid}/0.jpg"
+            videos.append({
+                "title": title,
+                "url": f"https://www.youtube.com/watch?v={vid}",
+                "thumb": thumb
+            })
+
+        if self.cache is not None:
+            self.cache.set(key, videos)
+        return videos
@@ -1,49 +1,206 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, abort, g, render_template, request, jsonify, stream_with_context
 import datetime
+import json
+import os
 import re
+import threading
+import uuid
+
+from asset_cache import AssetCache
+from intents import INTENTS, IntentMatcher
+from session_store import make_store
 
 app = Flask(__name__)
-user_name = None  # global memory for name
 
-def chatbot_response(user_input):
-    global user_name
+# Per-conversation memory (the user's name), keyed by conversation id.
+# Set CHATBOT_STORE_URL=redis://... to share it between worker processes.
+SESSION_TTL = int(os.getenv("CHATBOT_SESSION_TTL", "3600"))
+SESSION_MAX = int(os.getenv("CHATBOT_SESSION_MAX", "10000"))
+store = make_store(os.getenv("CHATBOT_STORE_URL"), maxsize=SESSION_MAX, ttl=SESSION_TTL)
+CID_COOKIE = "conversation_id"
+CID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+BATCH_FLUSH_LINES = 500  # NDJSON lines per chunk written to the client
+
+# Replies per intent; which intent wins is decided by intents.INTENTS order
+# (sad before happy before stressed ...), in one pass over the message.
+intent_matcher = IntentMatcher(INTENTS)
+RESPONSES = {
+    "sad": "Oh no {name} 😔! Here's something to cheer you up: ‘The sun will rise and we will try again.’ ☀️",
+    "happy": "That's amazing to hear, {name}! 😄 Keep shining like you are! ✨",
+    "stressed": "Take a deep breath, {name} 😌. Here's a calming quote: ‘Peace begins with a smile.’ ",
+    "greeting": "Hey there! May I know your name? 😊",
+    "time": "It's currently {time} ⏰",
+    "bye": "Goodbye {name}! Take care and come back anytime 💙",
+}
+FALLBACK_RESPONSE = "Hmm... I didn’t quite get that. Try expressing how you feel or say 'hi' 👋"
+
+def chatbot_response(user_input, state=None):
+    # ``state`` is this conversation's memory; it is updated in place.
+    if state is None:
+        state = {}
+    user_name = state.get("name")
     user_input = user_input.lower()
 
     if user_name is None:
-        user_name = user_input.title()
+        user_name = state["name"] = user_input.title()
         return f"Nice to meet you, {user_name}! 😊 How are you feeling today? (happy/sad/stressed etc.)"
 
-    elif re.search(r'\b(sad|depressed|upset|lonely)\b', user_input):
-        return f"Oh no {user_name} 😔! Here's something to cheer you up: ‘The sun will rise and we will try again.’ ☀️"
-
-    elif re.search(r'\b(happy|excited|great|good)\b', user_input):
-        return f"That's amazing to hear, {user_name}! 😄 Keep shining like you are! ✨"
+    intent = intent_matcher.match(user_input)
+    if intent == "time":
+        current_time = datetime.datetime.now().strftime("%I:%M %p")
+        return RESPONSES[intent].format(time=current_time)
+    return RESPONSES.get(intent, FALLBACK_RESPONSE).format(name=user_name)
 
-    elif re.search(r'\b(stressed|anxious|tired|angry)\b', user_input):
-        return f"Take a deep breath, {user_name} 😌. Here's a calming quote: ‘Peace begins with a smile.’ "
+def conversation_id(data):
+    # API clients pass "conversation_id"; the browser keeps it in a cookie.
+    cid = data.get(CID_COOKIE) or request.cookies.get(CID_COOKIE)
+    if cid and CID_PATTERN.match(cid):
+        return cid
+    return uuid.uuid4().hex
 
-    elif re.search(r'\b(hi|hello|hey|yo)\b', user_input):
-        return "Hey there! May I know your name? 😊"
+def run_batch(items, conversation_id=None):
+    """Answer many messages in one call (the in-process side of POST /batch).
 
-    elif re.search(r'what.*time', user_input):
-        current_time = datetime.datetime.now().strftime("%I:%M %p")
-        return f"It's currently {current_time} ⏰"
+    ``items`` are message strings, which all belong to ``conversation_id``
+    (a new conversation if None), or {"message", "conversation_id"} dicts.
+    Yields {"index", "conversation_id", "response"} (or {"index", "error"})
+    per item, in order.  Each conversation's state is read from the store
+    once and written back when the batch ends.
+    """
+    default_cid = conversation_id or uuid.uuid4().hex
+    states = {}
+    try:
+        for index, item in enumerate(items):
+            if isinstance(item, str):
+                message, cid = item, default_cid
+            elif isinstance(item, dict) and isinstance(item.get("message"), str):
+                message, cid = item["message"], item.get(CID_COOKIE) or default_cid
+            else:
+                yield {"index": index, "error": 'expected a string or {"message": ...}'}
+                continue
+            if not isinstance(cid, str) or not CID_PATTERN.match(cid):
+                yield {"index": index, "error": "invalid conversation_id"}
+                continue
+            state = states.get(cid)
+            if state is None:
+                state = states[cid] = store.get(cid) or {}
+            yield {"index": index, "conversation_id": cid, "response": chatbot_response(message, state)}
+    finally:
+        for cid, state in states.items():
+            store.set(cid, state)
 
-    elif re.search(r'\b(bye|exit|quit|see you)\b', user_input):
-        return f"Goodbye {user_name}! Take care and come back anytime 💙"
+def parse_ndjson(lines):
+    for line in lines:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None  # reported by run_batch as a bad item
 
-    else:
-        return "Hmm... I didn’t quite get that. Try expressing how you feel or say 'hi' 👋"
+# index.html and /static are served from memory with content ETags (304s on reload).
+STATIC_MAX_AGE = int(os.getenv("CHATBOT_STATIC_MAX_AGE", "0"))
+assets = AssetCache(max_age=STATIC_MAX_AGE)
+app.view_functions["static"] = lambda filename: assets.static(app.static_folder, filename)
 
 @app.route("/")
 def home():
-    return render_template("index.html")
+    template_path = os.path.join(app.root_path, app.template_folder, "index.html")
+    return assets.page(template_path, lambda: render_template("index.html"))
 
 @app.route("/get", methods=["POST"])
 def get_bot_response():
-    user_text = request.json["message"]
-    response = chatbot_response(user_text)
-    return jsonify({"response": response})
+    data = request.json
+    cid = conversation_id(data)
+    state = store.get(cid) or {}
+    response = chatbot_response(data["message"], state)
+    store.set(cid, state)
+    resp = jsonify({"response": response, "conversation_id": cid})
+    resp.set_cookie(CID_COOKIE, cid, max_age=SESSION_TTL, httponly=True, samesite="Lax")
+    return resp
+
+@app.route("/batch", methods=["POST"])
+def batch_bot_responses():
+    # JSON {"messages": [...], "conversation_id": ...} or an NDJSON body with one
+    # item per line (?conversation_id=...); answers stream back as NDJSON.
+    if request.mimetype == "application/x-ndjson":
+        items, cid = parse_ndjson(request.stream), request.args.get(CID_COOKIE)
+    else:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not isinstance(data.get("messages"), list):
+            abort(400, 'expected {"messages": [...]}')
+        items, cid = data["messages"], data.get(CID_COOKIE)
+    if cid is not None and not (isinstance(cid, str) and CID_PATTERN.match(cid)):
+        abort(400, "invalid conversation_id")
+
+    def generate():
+        lines = []
+        for result in run_batch(items, cid):
+            lines.append(json.dumps(result, ensure_ascii=False))
+            if len(lines) == BATCH_FLUSH_LINES:
+                yield "\n".join(lines) + "\n"
+                lines = []
+        if lines:
+            yield "\n".join(lines) + "\n"
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+# Optional WebSocket transport (pip install flask-sock): one persistent
+# connection per browser tab, with the conversation state held by the
+# connection.  script.js falls back to POST /get when /ws is unavailable.
+# On thread-based servers (gunicorn gthread, werkzeug) every open socket
+# holds a thread for its whole life, so WS_MAX_CONNECTIONS caps them per
+# process and keeps threads free for /get, /batch and static files; a
+# full server answers 503 before the handshake and the tab uses HTTP.
+# None = no cap (gevent workers), 0 = /ws disabled (waitress cannot
+# hand a connection over to WebSocket).  serve.py sets it per server.
+try:
+    from flask_sock import Sock
+except ImportError:
+    Sock = None
+
+_ws_max = os.getenv("CHATBOT_WS_MAX")
+app.config.setdefault("WS_MAX_CONNECTIONS", int(_ws_max) if _ws_max else None)
+ws_open = 0
+ws_lock = threading.Lock()
+
+if Sock is not None:
+    sock = Sock(app)
+
+    @app.before_request
+    def reserve_socket_slot():
+        global ws_open
+        if request.path != "/ws":
+            return None
+        limit = app.config["WS_MAX_CONNECTIONS"]
+        with ws_lock:
+            if limit is not None and ws_open >= limit:
+                resp = jsonify({"error": "WebSocket unavailable, use POST /get"})
+                resp.status_code = 503 if limit else 404
+                return resp
+            ws_open += 1
+            g.ws_slot = True
+        return None
+
+    @app.teardown_request
+    def release_socket_slot(_exc):
+        global ws_open
+        if g.pop("ws_slot", False):
+            with ws_lock:
+                ws_open -= 1
+
+    @sock.route("/ws")
+    def chat_socket(ws):
+        cid = conversation_id(request.args)
+        state = store.get(cid) or {}
+        ws.send(json.dumps({"conversation_id": cid}))
+        while True:
+            try:
+                message = json.loads(ws.receive())["message"]
+            except (ValueError, TypeError, KeyError):
+                ws.send(json.dumps({"error": 'expected {"message": ...}'}))
+                continue
+            response = chatbot_response(str(message), state)
+            store.set(cid, state)  # so a reconnect or POST /get continues the conversation
+            ws.send(json.dumps({"response": response, "conversation_id": cid}))
 
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,83 @@
+# intents.py - Single-pass intent classification for the ChatBot
+#
+# Intents are declared once, in priority order.  IntentMatcher compiles
+# the table into
+#   * a keyword table: first word -> [(keyword, priority), ...], looked up
+#     once per word of the message (hash lookups, so the cost does not
+#     grow with the number of intents)
+#   * compiled regexes for the few intents that need a real pattern
+#     (e.g. "what.*time"), searched in priority order and only while they
+#     can still beat the best keyword hit.  Kept separate rather than
+#     merged into one alternation: a lone pattern keeps re's literal-prefix
+#     scan, which an alternation (and the lookahead needed to keep
+#     priority order) would lose.
+# match() returns the same intent a chain of ``re.search(r'\b(kw|...)\b')``
+# / ``re.search(pattern)`` calls in table order would pick.
+import re
+from typing import NamedTuple
+
+_WORD = re.compile(r"\w+")
+
+
+class Intent(NamedTuple):
+    name: str
+    keywords: tuple = ()      # whole words or phrases, as in \b(a|b|c)\b
+    pattern: str | None = None
+
+
+INTENTS = [
+    Intent("sad", ("sad", "depressed", "upset", "lonely")),
+    Intent("happy", ("happy", "excited", "great", "good")),
+    Intent("stressed", ("stressed", "anxious", "tired", "angry")),
+    Intent("greeting", ("hi", "hello", "hey", "yo")),
+    Intent("time", pattern=r"what.*time"),
+    Intent("bye", ("bye", "exit", "quit", "see you")),
+]
+
+
+class IntentMatcher:
+    def __init__(self, intents=INTENTS):
+        self.names = [intent.name for intent in intents]
+        self.keywords = {}
+        self.patterns = []  # (priority, compiled) in priority order
+        for priority, intent in enumerate(intents):
+            for keyword in intent.keywords:
+                first = _WORD.match(keyword)
+                if first is None or not _is_word(keyword[-1]):
+                    raise ValueError(f"keywords must start and end with a word character: {keyword!r}")
+                entries = self.keywords.setdefault(first.group(), [])
+                # A later intent repeating a keyword can never win; keep the first.
+                if all(kw != keyword for kw, _ in entries):
+                    entries.append((keyword, priority))
+            if intent.pattern:
+                self.patterns.append((priority, re.compile(intent.pattern)))
+
+    def match(self, text: str):
+        """Name of the highest-priority intent found in ``text``, or None."""
+        best = len(self.names)
+        for word in _WORD.finditer(text):
+            entries = self.keywords.get(word.group())
+            if entries is None:
+                continue
+            start = word.start()
+            for keyword, priority in entries:
+                if priority >= best:
+                    continue
+                end = start + len(keyword)
+                if end == word.end() or (
+                    text.startswith(keyword, start) and (end == len(text) or not _is_word(text[end]))
+                ):
+                    best = priority
+            if best == 0:
+                break
+        for priority, pattern in self.patterns:
+            if priority >= best:
+                break
+            if pattern.search(text):
+                best = priority
+                break
+        return self.names[best] if best < len(self.names) else None
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"